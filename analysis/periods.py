@@ -0,0 +1,340 @@
+import heapq
+import json
+import os
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+
+NS_PER_DAY = 86_400 * 10**9
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Period:
+    start: int
+    end: int
+    mean: float
+
+    @property
+    def count(self) -> int:
+        return self.end - self.start + 1
+
+
+@dataclass(frozen=True)
+class WindowPolicy:
+    min_days: float = 3
+    min_tweets: int = 3
+
+    @property
+    def label(self) -> str:
+        return f"{self.min_days:g}d / {self.min_tweets}+ tweets"
+
+
+def to_ns(timestamps) -> np.ndarray:
+    # datetime64 of any unit -> int64 ns, plain numbers are epoch seconds
+
+    ts = np.asarray(timestamps)
+
+    if np.issubdtype(ts.dtype, np.datetime64):
+        return ts.astype("datetime64[ns]").view(np.int64)
+
+    if ts.dtype == object:
+        return np.asarray(ts, dtype="datetime64[ns]").view(np.int64)
+
+    return np.round(ts.astype(np.float64) * 1e9).astype(np.int64)
+
+
+def prefix_sums(scores) -> np.ndarray:
+
+    prefix = np.zeros(len(scores) + 1, dtype=np.float64)
+    np.cumsum(np.asarray(scores, dtype=np.float64), out=prefix[1:])
+    return prefix
+
+
+def _cross(ax, ay, bx, by, cx, cy):
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _scan(ts, prefix, min_span, min_tweets, lo=0, hi=None):
+    """Lowest-mean window over sorted ``ts`` via an upper hull of prefix points.
+
+    The mean of tweets ``i..j`` is the slope between ``(i, P[i])`` and
+    ``(j + 1, P[j + 1])``. For each end ``j`` the allowed starts are a prefix of
+    the timeline that only grows, so candidate starts enter a deque once and
+    leave it once, which keeps the whole scan linear.
+    """
+
+    hi = len(ts) if hi is None else hi
+    hull = []
+    head = 0
+    nxt = lo
+    best = None
+    best_mean = float("inf")
+
+    for j in range(lo + min_tweets - 1, hi):
+        limit = ts[j] - min_span
+
+        while nxt <= j - min_tweets + 1 and ts[nxt] <= limit:
+            x, y = nxt, prefix[nxt]
+            while len(hull) - head >= 2 and _cross(
+                hull[-2], prefix[hull[-2]], hull[-1], prefix[hull[-1]], x, y
+            ) > 0:
+                hull.pop()
+            hull.append(x)
+            nxt += 1
+
+        if len(hull) == head:
+            continue
+
+        qx, qy = j + 1, prefix[j + 1]
+
+        while len(hull) - head >= 2:
+            a, b = hull[head], hull[head + 1]
+            if (qy - prefix[a]) * (qx - b) > (qy - prefix[b]) * (qx - a):
+                head += 1
+            else:
+                break
+
+        i = hull[head]
+        mean = (qy - prefix[i]) / (qx - i)
+
+        if mean < best_mean or (
+            mean == best_mean and best is not None and i < best[0]
+        ):
+            best_mean = mean
+            best = (i, j)
+
+    if best is None:
+        return None
+
+    return Period(best[0], best[1], float(best_mean))
+
+
+class Timeline:
+    """Sorted timestamps and score prefix sums shared by every window query.
+
+    Build it once per account; each policy and each top-k search then reads
+    the same arrays instead of re-sorting or re-summing the scores.
+    """
+
+    def __init__(self, timestamps, scores):
+
+        ts = to_ns(timestamps)
+
+        if len(ts) != len(scores):
+            raise ValueError("timestamps and scores must have the same length")
+
+        if len(ts) > 1 and np.any(np.diff(ts) < 0):
+            raise ValueError("timestamps must be sorted in ascending order")
+
+        self.n = len(ts)
+        self.ts = ts.tolist()
+        self.prefix = prefix_sums(scores).tolist()
+
+    def darkest(self, policy=WindowPolicy(), lo=0, hi=None):
+
+        return _scan(
+            self.ts,
+            self.prefix,
+            int(policy.min_days * NS_PER_DAY),
+            max(int(policy.min_tweets), 1),
+            lo,
+            self.n if hi is None else hi,
+        )
+
+    def worst_periods(self, policy=WindowPolicy(), k=3):
+        """Greedy top-k: take the darkest period, then search the gaps around it."""
+
+        results = []
+        heap = []
+
+        def push(lo, hi):
+            period = self.darkest(policy, lo, hi)
+            if period is not None:
+                heapq.heappush(heap, (period.mean, period.start, period.end, lo, hi))
+
+        push(0, self.n)
+
+        while heap and len(results) < k:
+            mean, start, end, lo, hi = heapq.heappop(heap)
+            results.append(Period(start, end, mean))
+            push(lo, start)
+            push(end + 1, hi)
+
+        return results
+
+    def worst_periods_by_policy(self, policies, k=3):
+
+        return {policy: self.worst_periods(policy, k) for policy in policies}
+
+
+def find_darkest_period(timestamps, scores, min_days=3, min_tweets=3):
+    """Return the contiguous run of tweets with the lowest mean score.
+
+    ``timestamps`` must be sorted ascending. A run qualifies when it spans at
+    least ``min_days`` full days and holds at least ``min_tweets`` tweets.
+    Returns a ``Period`` of positional indices, or ``None``.
+    """
+
+    return Timeline(timestamps, scores).darkest(WindowPolicy(min_days, min_tweets))
+
+
+def find_worst_periods(timestamps, scores, policies, k=3):
+    """Top ``k`` non-overlapping darkest periods for each policy in ``policies``."""
+
+    return Timeline(timestamps, scores).worst_periods_by_policy(policies, k)
+
+
+def _value_to_ns(value) -> int:
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (value - EPOCH) // timedelta(microseconds=1) * 1000
+
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[ns]").view(np.int64))
+
+    return int(round(float(value) * 1e9))
+
+
+class DarkestPeriodDetector:
+    """Incremental version of ``Timeline.darkest`` for tweets arriving in order.
+
+    State is the running score total, the hull of start points that are old
+    enough to open a window, and the recent start points that are not yet.
+    Each ``update`` is amortized O(1) and the whole state can be checkpointed
+    with ``save``/``load`` so a restart does not need the tweet history.
+    """
+
+    def __init__(self, policy=WindowPolicy()):
+
+        self.policy = policy
+        self.min_span = int(policy.min_days * NS_PER_DAY)
+        self.min_tweets = max(int(policy.min_tweets), 1)
+
+        self.n = 0
+        self.total = 0.0
+        self.last_ts = None
+        self.hull = deque()
+        self.pending = deque()
+        self.best = None
+
+    @property
+    def period(self):
+
+        if self.best is None:
+            return None
+
+        start, end, mean, _, _ = self.best
+        return Period(start, end, mean)
+
+    @property
+    def period_bounds(self):
+        """``(start, end)`` of the current darkest period as epoch nanoseconds."""
+
+        if self.best is None:
+            return None
+
+        return self.best[3], self.best[4]
+
+    def update(self, timestamp, score):
+
+        ts = _value_to_ns(timestamp)
+
+        if self.last_ts is not None and ts < self.last_ts:
+            raise ValueError("tweets must arrive in timestamp order")
+
+        j = self.n
+        self.pending.append((j, self.total, ts))
+        self.total += float(score)
+        self.n += 1
+        self.last_ts = ts
+
+        hull = self.hull
+        limit = ts - self.min_span
+
+        while (
+            self.pending
+            and self.pending[0][0] <= j - self.min_tweets + 1
+            and self.pending[0][2] <= limit
+        ):
+            point = self.pending.popleft()
+            x, y = point[0], point[1]
+            while len(hull) >= 2 and _cross(
+                hull[-2][0], hull[-2][1], hull[-1][0], hull[-1][1], x, y
+            ) > 0:
+                hull.pop()
+            hull.append(point)
+
+        if not hull:
+            return self.period
+
+        qx, qy = j + 1, self.total
+
+        while len(hull) >= 2:
+            a, b = hull[0], hull[1]
+            if (qy - a[1]) * (qx - b[0]) > (qy - b[1]) * (qx - a[0]):
+                hull.popleft()
+            else:
+                break
+
+        i, p_i, ts_i = hull[0]
+        mean = (qy - p_i) / (qx - i)
+
+        if self.best is None or mean < self.best[2] or (
+            mean == self.best[2] and i < self.best[0]
+        ):
+            self.best = (i, j, mean, ts_i, ts)
+
+        return self.period
+
+    def extend(self, timestamps, scores):
+
+        for timestamp, score in zip(timestamps, scores):
+            self.update(timestamp, score)
+
+        return self.period
+
+    def state_dict(self):
+
+        return {
+            "min_days": self.policy.min_days,
+            "min_tweets": self.policy.min_tweets,
+            "n": self.n,
+            "total": self.total,
+            "last_ts": self.last_ts,
+            "hull": [list(point) for point in self.hull],
+            "pending": [list(point) for point in self.pending],
+            "best": list(self.best) if self.best is not None else None,
+        }
+
+    @classmethod
+    def from_state_dict(cls, state):
+
+        detector = cls(WindowPolicy(state["min_days"], state["min_tweets"]))
+        detector.n = state["n"]
+        detector.total = state["total"]
+        detector.last_ts = state["last_ts"]
+        detector.hull = deque(tuple(point) for point in state["hull"])
+        detector.pending = deque(tuple(point) for point in state["pending"])
+        detector.best = tuple(state["best"]) if state["best"] is not None else None
+        return detector
+
+    def save(self, path):
+
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state_dict(), f)
+
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_state_dict(json.load(f))
@@ -0,0 +1,120 @@
+import queue
+import threading
+
+from scraping.process import Process
+
+_DONE = object()
+
+
+class ScrapeScorePipeline:
+    """Scores tweets while the scraper is still fetching them.
+
+    Every replayed response is parsed by a ``Process`` as soon as it arrives
+    and its new tweets, up to the scraper's ``MAX_TWEETS``, go onto a bounded
+    queue. The same ``Process`` is handed to ``scrape_and_process`` afterwards,
+    so no response is parsed twice. A scoring thread drains that queue in
+    batches of ``batch_size``. The thread also flushes a partial batch when
+    nothing new has arrived for ``flush_after`` seconds. Once ``max_pending``
+    tweets are waiting, the fetch callback blocks until the model catches up,
+    so scraping never runs far ahead of inference.
+
+    ``model`` must already be loaded; load it on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        model,
+        batch_size=32,
+        max_pending=256,
+        flush_after=0.5,
+        prepare=None,
+    ):
+
+        self.scraper = scraper
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_after = flush_after
+        self.prepare = prepare or (lambda text: text)
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.proc = Process()
+        self.enqueued = 0
+        self.scores = {}
+        self.error = None
+
+    def on_response(self, data):
+
+        # every tweet is still materialized, only scoring stops at the cap
+        for tweet_data in self.proc.iter_response(data):
+            tweet = tweet_data["tweet"]
+            if tweet["id"] and self.enqueued < self.scraper.MAX_TWEETS:
+                self.queue.put((tweet["id"], self.prepare(tweet["text"])))
+                self.enqueued += 1
+
+    def score(self, batch):
+
+        scores = self.model.batch_scores([text for _, text in batch])
+        self.scores.update(zip((tweet_id for tweet_id, _ in batch), scores))
+
+    def _score_loop(self):
+
+        batch = []
+
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_after if batch else None)
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _DONE:
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            # after a failure keep draining so the producer never blocks
+            if batch and self.error is None:
+                try:
+                    self.score(batch)
+                except Exception as e:
+                    self.error = e
+
+            batch = []
+
+            if item is _DONE:
+                return
+
+    def run(self, user):
+        """Scrape ``user`` and score the tweets as they come in.
+
+        Returns the usual ``scrape_and_process`` outputs plus a list of
+        scores aligned with the first of them, the all-tweets list.
+        """
+
+        worker = threading.Thread(target=self._score_loop, daemon=True)
+        worker.start()
+        self.scraper.on_response = self.on_response
+
+        try:
+            outputs = self.scraper.scrape_and_process(user, proc=self.proc)
+        finally:
+            self.scraper.on_response = None
+            self.queue.put(_DONE)
+            worker.join()
+
+        if self.error is not None:
+            raise self.error
+
+        all_tweets = outputs[0] or []
+        scores = [
+            self.scores.get(tweet["id"]) if tweet["id"] else None
+            for tweet in all_tweets
+        ]
+
+        # tweets loaded from a tweet store were never streamed
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            texts = [self.prepare(all_tweets[i]["text"]) for i in missing]
+            for i, score in zip(missing, self.model.batch_scores(texts)):
+                scores[i] = score
+
+        return (*outputs, scores)
@@ -0,0 +1,174 @@
+import math
+import random
+
+import numpy as np
+
+from periods import (
+    NS_PER_DAY,
+    DarkestPeriodDetector,
+    Timeline,
+    WindowPolicy,
+    find_darkest_period,
+)
+
+POLICIES = [
+    WindowPolicy(min_days=0, min_tweets=1),
+    WindowPolicy(min_days=1, min_tweets=3),
+    WindowPolicy(min_days=3, min_tweets=3),
+    WindowPolicy(min_days=7, min_tweets=5),
+]
+
+
+def random_timeline(n, seed):
+
+    rng = random.Random(seed)
+    timestamps = []
+    t = 1_600_000_000
+
+    for _ in range(n):
+        # bursts of same-second tweets and multi-day gaps both show up
+        t += rng.choice([0, 60, 3600, 86_400, 3 * 86_400]) + rng.randrange(60)
+        timestamps.append(t)
+
+    scores = [rng.uniform(-1, 1) for _ in range(n)]
+    return timestamps, scores
+
+
+def brute_darkest(timestamps, scores, policy, lo=0, hi=None):
+    # every allowed window, the quadratic search the app used to run
+
+    hi = len(scores) if hi is None else hi
+    min_span = policy.min_days * NS_PER_DAY / 1e9
+    best = None
+
+    for i in range(lo, hi):
+        for j in range(i + max(policy.min_tweets, 1) - 1, hi):
+            if timestamps[j] - timestamps[i] < min_span:
+                continue
+
+            mean = sum(scores[i : j + 1]) / (j - i + 1)
+            if best is None or mean < best[2]:
+                best = (i, j, mean)
+
+    return best
+
+
+def brute_worst_periods(timestamps, scores, policy, k):
+
+    gaps = [(0, len(scores))]
+    results = []
+
+    while len(results) < k:
+        found = [
+            (period, lo, hi)
+            for lo, hi in gaps
+            for period in [brute_darkest(timestamps, scores, policy, lo, hi)]
+            if period is not None
+        ]
+        if not found:
+            break
+
+        (start, end, mean), lo, hi = min(found, key=lambda item: item[0][2])
+        results.append(mean)
+        gaps.remove((lo, hi))
+        gaps += [(lo, start), (end + 1, hi)]
+
+    return results
+
+
+def check_period(period, expected, scores):
+
+    if expected is None:
+        assert period is None
+        return
+
+    assert period is not None
+    assert math.isclose(period.mean, expected[2], abs_tol=1e-9)
+    assert math.isclose(
+        period.mean, np.mean(scores[period.start : period.end + 1]), abs_tol=1e-9
+    )
+
+
+def test_darkest_matches_brute_force():
+
+    for seed in range(20):
+        timestamps, scores = random_timeline(60, seed)
+        timeline = Timeline(timestamps, scores)
+
+        for policy in POLICIES:
+            expected = brute_darkest(timestamps, scores, policy)
+            check_period(timeline.darkest(policy), expected, scores)
+
+    assert find_darkest_period([0, 1], [0.0, 0.0]) is None
+
+
+def test_worst_periods_match_brute_force():
+
+    for seed in range(10):
+        timestamps, scores = random_timeline(40, seed)
+        timeline = Timeline(timestamps, scores)
+
+        for policy in POLICIES:
+            periods = timeline.worst_periods(policy, k=4)
+            expected = brute_worst_periods(timestamps, scores, policy, k=4)
+
+            assert len(periods) == len(expected)
+            for period, mean in zip(periods, expected):
+                assert math.isclose(period.mean, mean, abs_tol=1e-9)
+
+            # no two periods share a tweet
+            taken = [i for p in periods for i in range(p.start, p.end + 1)]
+            assert len(taken) == len(set(taken))
+
+
+def test_detector_matches_brute_force_at_every_step():
+
+    for seed in range(5):
+        timestamps, scores = random_timeline(50, seed)
+
+        for policy in POLICIES:
+            detector = DarkestPeriodDetector(policy)
+
+            for n, (timestamp, score) in enumerate(zip(timestamps, scores), 1):
+                period = detector.update(timestamp, score)
+                expected = brute_darkest(timestamps[:n], scores[:n], policy)
+                check_period(period, expected, scores)
+
+
+def test_detector_resumes_from_checkpoint(tmp_path):
+
+    timestamps, scores = random_timeline(120, seed=67)
+    path = tmp_path / "detector.json"
+
+    for policy in POLICIES:
+        uninterrupted = DarkestPeriodDetector(policy)
+        expected = [
+            (uninterrupted.update(t, s), uninterrupted.period_bounds)
+            for t, s in zip(timestamps, scores)
+        ]
+
+        for split in (0, 1, 37, 90, 120):
+            detector = DarkestPeriodDetector(policy)
+            detector.extend(timestamps[:split], scores[:split])
+            detector.save(path)
+
+            # a fresh process picks up mid-stream and must stay in lockstep
+            resumed = DarkestPeriodDetector.load(path)
+            for n in range(split, len(scores)):
+                period = resumed.update(timestamps[n], scores[n])
+                assert (period, resumed.period_bounds) == expected[n]
+
+            assert resumed.state_dict() == uninterrupted.state_dict()
+
+
+if __name__ == "__main__":
+
+    import pathlib
+    import tempfile
+
+    test_darkest_matches_brute_force()
+    test_worst_periods_match_brute_force()
+    test_detector_matches_brute_force_at_every_step()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_detector_resumes_from_checkpoint(pathlib.Path(tmp))
@@ -0,0 +1,11 @@
+def clean_text(text):
+
+    new_text = text.replace(r"http\S+", "")
+
+    if len(new_text) < 5:
+
+        new_text = text
+
+    text = new_text.replace("@", "")
+    text = text.replace("\n", " ").replace("\r", " ").strip()
+    return " ".join(text.split())
@@ -1,35 +1,140 @@
+import time
+
+SCRIPT_START = time.perf_counter()
+
+import json
+import os
 import sys
 import streamlit as st
-from scraping.scrape import Scraper
 import pandas as pd
 import asyncio
-from sentiment_analysis.pretrained.pipeline.inference import infer_sentiment
+from concurrent.futures import ThreadPoolExecutor
+from analysis.periods import Timeline, WindowPolicy
+from analysis.text import clean_text
 import re
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 
+# torch/transformers, plotly and Playwright are imported where they are first
+# used so the first page renders before they are loaded
+IMPORTS_DONE = time.perf_counter()
+
+STARTUP_METRICS_PATH = os.environ.get("STARTUP_METRICS_PATH", "startup_metrics.jsonl")
+TWEET_STORE_DIR = os.environ.get("TWEET_STORE_DIR", "tweet_store")
+
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 
-def clean_text(text):
+PERIOD_POLICIES = [
+    WindowPolicy(min_days=3, min_tweets=3),
+    WindowPolicy(min_days=7, min_tweets=3),
+    WindowPolicy(min_days=30, min_tweets=3),
+]
 
-    new_text = text.replace(r"http\S+", "")
 
-    if len(new_text) < 5:
+st.set_page_config(
+    page_title="Twitter Sentiment Analysis", layout="wide", page_icon="🐦"
+)
 
-        new_text = text
 
-    text = new_text.replace("@", "")
-    text = text.replace("\n", " ").replace("\r", " ").strip()
-    return " ".join(text.split())
+@st.cache_resource
+def get_score_cache():
 
+    from sentiment_analysis.pretrained.pipeline.cache import ScoreCache
 
-st.set_page_config(
-    page_title="Twitter Sentiment Analysis", layout="wide", page_icon="🐦"
-)
+    return ScoreCache(path="sentiment_cache.sqlite")
+
+
+@st.cache_resource
+def get_tweet_store():
+
+    from scraping.tweet_store import TweetStore
+
+    return TweetStore(root=TWEET_STORE_DIR)
+
+
+def load_transformer():
+
+    from sentiment_analysis.pretrained.pipeline.service import InferenceClient
+
+    # a shared service batches requests from every session against one model
+    service_url = os.environ.get("SENTIMENT_SERVICE_URL")
+    if service_url:
+        client = InferenceClient(service_url)
+        if client.healthy():
+            return client
+
+    from sentiment_analysis.pretrained.pipeline.inference import infer_sentiment
+
+    return infer_sentiment(cache=get_score_cache())
+
+
+def get_sentiment_model():
+
+    model = load_transformer()
+
+    # optional LR fast path trained by training/train.py
+    cascade_dir = os.environ.get("SENTIMENT_CASCADE_DIR")
+    if cascade_dir:
+        from sentiment_analysis.pretrained.pipeline.cascade import CascadeScorer
+
+        return CascadeScorer(model, reports_dir=cascade_dir)
+
+    return model
+
+
+def log_startup(metrics):
+
+    try:
+        with open(STARTUP_METRICS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(metrics) + "\n")
+    except OSError:
+        pass
+
+
+@st.cache_resource
+def start_model_warmup():
+    """Load the model on a background thread, once per server process.
+
+    Runs while the user is typing a handle and while the scraper works, so
+    the model is usually ready by the time tweets need scoring. The time to
+    first render and to a loaded model are appended to ``STARTUP_METRICS_PATH``.
+    """
+
+    metrics = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "imports_s": round(IMPORTS_DONE - SCRIPT_START, 3),
+        "first_render_s": round(time.perf_counter() - SCRIPT_START, 3),
+    }
+
+    def done(future):
+        metrics["model_ready_s"] = round(time.perf_counter() - SCRIPT_START, 3)
+        metrics["model_loaded"] = future.exception() is None
+        log_startup(metrics)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-warmup")
+    future = executor.submit(get_sentiment_model)
+    future.add_done_callback(done)
+    executor.shutdown(wait=False)
+    return future
+
+
+def wait_for_model():
+
+    try:
+        return start_model_warmup().result()
+    except Exception:
+        # let the next run retry instead of caching the failure
+        start_model_warmup.clear()
+        raise
+
+
+def wait_for_run_model():
+    # the cascade is shared by every session, give each run its own counters
+
+    model = wait_for_model()
+    return model.session() if hasattr(model, "session") else model
 
 
 def home_page():
@@ -43,24 +148,49 @@ def home_page():
 
     submit = st.button("Start Analysis")
 
+    start_model_warmup()
+
     if user and tweets and submit:
 
+        import plotly.express as px
+
+        from analysis.pipeline import ScrapeScorePipeline
+        from scraping.scrape import Scraper
+        from sentiment_analysis.pretrained.pipeline.cache import score_category
+
         with st.spinner("Initializing the Scraper..."):
-            scraper = Scraper(user, max_tweets=tweets, max_scrolls=5)
-        with st.spinner("Setting up Sentiment Analysis Model..."):
-            sentiment_infer = infer_sentiment()
+            # cursor pagination stops at the newest tweet already in the
+            # store, so repeat runs only fetch what was posted since
+            scraper = Scraper(
+                user,
+                max_tweets=tweets,
+                max_scrolls=5,
+                pagination="cursor",
+                tweet_store=get_tweet_store(),
+            )
         with st.spinner("Estimating time to complete..."):
             estimated_time = scraper.get_estimated_time()
             st.info(f"Estimated time to complete: {estimated_time:.1f} seconds")
 
-        with st.spinner("Scraping and processing tweets..."):
+        with st.spinner("Scraping, processing and scoring tweets..."):
+
+            # usually ready, the model has been warming up since the page loaded
+            model = wait_for_run_model()
 
-            all_tweets_file, quotes_file, combined_file = scraper.scrape_and_process(
-                user
+            # tweets are scored in batches while later pages are still loading
+            pipeline = ScrapeScorePipeline(scraper, model, prepare=clean_text)
+            all_tweets_file, quotes_file, combined_file, sentiment_results = (
+                pipeline.run(user)
             )
 
             st.success("Scraping and processing completed successfully!")
 
+            if hasattr(pipeline.model, "session"):
+                skipped = pipeline.model.stats()["skip_fraction"]
+                st.caption(
+                    f"{skipped:.0%} of tweets were scored without the transformer"
+                )
+
             wanted_cols = ["text", "created_at", "favorite_count", "retweet_count"]
 
             df = pd.DataFrame(scraper.all_tweets_file)[wanted_cols]
@@ -71,15 +201,11 @@ def home_page():
 
         with st.spinner("Analyzing sentiment..."):
 
-            sentiment_results = sentiment_infer.batch_scores(df["text"].tolist())
-
             sentiment_df = df.copy()
             sentiment_df["sentiment_score"] = sentiment_results
 
             sentiment_df["sentiment_category"] = sentiment_df["sentiment_score"].apply(
-                lambda x: (
-                    "Positive" if x > 0.1 else "Negative" if x < -0.1 else "Neutral"
-                )
+                score_category
             )
 
             st.success("Sentiment analysis completed successfully!")
@@ -224,36 +350,18 @@ def home_page():
                     )
                     sentiment_df = sentiment_df.sort_values("created_at")
 
-                    def find_darkest_period(df):
-                        min_days = 3
-                        min_tweets = 3
-                        worst_avg = float("inf")
-                        darkest_period = None
-
-                        for start_idx in range(len(df)):
-                            start_date = df.iloc[start_idx]["created_at"]
-
-                            for end_idx in range(start_idx + min_tweets - 1, len(df)):
-                                end_date = df.iloc[end_idx]["created_at"]
-
-                                days_diff = (end_date - start_date).days
-                                if days_diff < min_days:
-                                    continue
-
-                                period_tweets = df.iloc[start_idx : end_idx + 1]
-
-                                if len(period_tweets) < min_tweets:
-                                    continue
-
-                                avg_sentiment = period_tweets["sentiment_score"].mean()
-
-                                if avg_sentiment < worst_avg:
-                                    worst_avg = avg_sentiment
-                                    darkest_period = period_tweets.copy()
-
-                        return darkest_period, worst_avg
+                    timeline = Timeline(
+                        sentiment_df["created_at"].to_numpy(dtype="datetime64[ns]"),
+                        sentiment_df["sentiment_score"].to_numpy(),
+                    )
+                    period = timeline.darkest(WindowPolicy(min_days=3, min_tweets=3))
 
-                    darkest_period, worst_avg = find_darkest_period(sentiment_df)
+                    darkest_period, worst_avg = None, float("inf")
+                    if period is not None:
+                        darkest_period = sentiment_df.iloc[
+                            period.start : period.end + 1
+                        ]
+                        worst_avg = period.mean
 
                     if darkest_period is not None and len(darkest_period) >= 3:
 
@@ -396,6 +504,29 @@ def home_page():
 
                         st.plotly_chart(fig_timeline, use_container_width=True)
 
+                        st.write("**Worst Periods by Window:**")
+
+                        worst_rows = []
+                        for policy, periods in timeline.worst_periods_by_policy(
+                            PERIOD_POLICIES, k=3
+                        ).items():
+                            for rank, p in enumerate(periods, start=1):
+                                worst_rows.append(
+                                    {
+                                        "Window": policy.label,
+                                        "Rank": rank,
+                                        "Start": sentiment_df["created_at"].iloc[
+                                            p.start
+                                        ],
+                                        "End": sentiment_df["created_at"].iloc[p.end],
+                                        "Tweets": p.count,
+                                        "Avg Sentiment": round(p.mean, 3),
+                                    }
+                                )
+
+                        if worst_rows:
+                            st.dataframe(pd.DataFrame(worst_rows), hide_index=True)
+
                     else:
                         st.warning(
                             "Could not find a period of at least 3 days with 3+ tweets for analysis."
@@ -427,9 +558,6 @@ def about_page():
         st.error("bts.md file not found")
 
 
-scraper = Scraper("elonmusk", max_tweets=50, max_scrolls=5)
-
-
 home = st.Page(home_page, title="Home(Demo)", icon="🐦")
 about = st.Page(about_page, title="How it works: Behind The Scenes", icon="📃")
 
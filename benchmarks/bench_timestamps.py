@@ -0,0 +1,39 @@
+import sys
+import time
+from pathlib import Path
+
+from dateutil import parser
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import make_created_at
+from scraping.process import created_at_to_epoch, parse_created_at
+
+
+def bench(n=100_000):
+
+    values = make_created_at(n)
+
+    t0 = time.perf_counter()
+    slow = [parser.parse(v).timestamp() for v in values]
+    t_dateutil = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = [parse_created_at(v).timestamp() for v in values]
+    t_fast = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = created_at_to_epoch(values)
+    t_batch = time.perf_counter() - t0
+
+    assert slow == fast == batch.tolist()
+
+    print(f"{n} timestamps")
+    print(f"   dateutil.parser.parse: {t_dateutil:.3f}s")
+    print(f"   parse_created_at:      {t_fast:.3f}s ({t_dateutil / t_fast:.1f}x)")
+    print(f"   created_at_to_epoch:   {t_batch:.3f}s ({t_dateutil / t_batch:.1f}x)")
+
+
+if __name__ == "__main__":
+
+    bench()
@@ -0,0 +1,248 @@
+import datetime
+
+import numpy as np
+
+WORDS = (
+    "the a to and is in it you of for on my that at with me this be so have "
+    "just but not was are day get like good love today going work now can "
+    "cannot gonna wanna gotta lemme gimme really back time night still one "
+    "happy sad miss bad great home tired sleep tomorrow week lol haha omg ugh"
+).split()
+
+EMOJI = ["", "", "", " :)", " :(", " ;D", " 😭", " 🎉"]
+
+START = datetime.datetime(2010, 1, 1, tzinfo=datetime.timezone.utc)
+FIFTEEN_YEARS = 15 * 365 * 86400
+
+
+def make_texts(n, seed=67):
+    "Tweet-like texts with handles, links, punctuation, newlines and contractions"
+
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 30, n)
+    words = rng.choice(WORDS, lengths.sum())
+    extras = rng.integers(0, 8, (n, 3))
+
+    texts = []
+    at = 0
+
+    for length, (handle, link, emoji) in zip(lengths, extras):
+        text = " ".join(words[at : at + length])
+        at += length
+
+        if handle < 3:
+            text = f"@user_{handle}{length} {text}"
+        if link < 2:
+            text = f"{text} https://t.co/{length:04d}abc"
+        if link == 7:
+            text = f"{text}!!!\nwww.example.com/{handle}"
+
+        texts.append(text + EMOJI[emoji])
+
+    return texts
+
+
+def make_created_at(n, seed=67):
+    "Twitter ``created_at`` strings, e.g. ``Wed Oct 10 20:19:24 +0000 2018``"
+
+    rng = np.random.default_rng(seed)
+
+    return [
+        (START + datetime.timedelta(seconds=int(s))).strftime(
+            "%a %b %d %H:%M:%S +0000 %Y"
+        )
+        for s in rng.integers(0, FIFTEEN_YEARS, n)
+    ]
+
+
+def make_tweet_legacies(n, seed=67):
+    "``legacy`` objects as found under ``tweet_results.result``"
+
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(0, 5000, (n, 4))
+    replies = rng.random(n) < 0.2
+
+    return [
+        {
+            "id_str": str(10**18 + i),
+            "full_text": text,
+            "created_at": created_at,
+            "retweet_count": int(c[0]),
+            "favorite_count": int(c[1]),
+            "reply_count": int(c[2]),
+            "quote_count": int(c[3]),
+            "lang": "en",
+            "in_reply_to_status_id_str": str(10**18 + i - 1) if reply else None,
+            "in_reply_to_user_id_str": "44196397" if reply else None,
+            "in_reply_to_screen_name": "user_0" if reply else None,
+        }
+        for i, (text, created_at, c, reply) in enumerate(
+            zip(make_texts(n, seed), make_created_at(n, seed), counts, replies)
+        )
+    ]
+
+
+def tweet_entry(legacy, quoted=None):
+
+    result = {"__typename": "Tweet", "rest_id": legacy["id_str"], "legacy": legacy}
+    if quoted is not None:
+        result["quoted_status_result"] = {"result": {"legacy": quoted}}
+
+    return {
+        "entryId": f"tweet-{legacy['id_str']}",
+        "sortIndex": legacy["id_str"],
+        "content": {
+            "entryType": "TimelineTimelineItem",
+            "itemContent": {
+                "itemType": "TimelineTweet",
+                "tweet_results": {"result": result},
+            },
+        },
+    }
+
+
+def cursor_entry(value, cursor_type="Bottom"):
+
+    return {
+        "entryId": f"cursor-{cursor_type.lower()}-{value}",
+        "content": {
+            "entryType": "TimelineTimelineCursor",
+            "cursorType": cursor_type,
+            "value": value,
+        },
+    }
+
+
+def make_timeline(n, page_size=20, quote_rate=0.1, duplicate_rate=0.02, seed=67):
+    """UserTweets GraphQL responses holding ``n`` distinct tweets.
+
+    Pages carry ``page_size`` tweets plus a bottom cursor. About
+    ``quote_rate`` of the tweets quote another one and ``duplicate_rate``
+    of the entries repeat a tweet from the previous page, as happens when
+    scrolling overlaps.
+    """
+
+    rng = np.random.default_rng(seed)
+    legacies = make_tweet_legacies(n, seed)
+    quoted = make_tweet_legacies(max(1, int(n * quote_rate)), seed + 1)
+
+    pages = []
+    previous = []
+
+    for start in range(0, n, page_size):
+        page = legacies[start : start + page_size]
+        entries = []
+
+        for legacy in page:
+            quote = (
+                quoted[rng.integers(len(quoted))] if rng.random() < quote_rate else None
+            )
+            entries.append(tweet_entry(legacy, quote))
+
+        for legacy in previous:
+            if rng.random() < duplicate_rate:
+                entries.append(tweet_entry(legacy))
+
+        entries.append(cursor_entry(f"cursor-{start + page_size}"))
+        previous = page
+
+        pages.append(
+            {
+                "data": {
+                    "user": {
+                        "result": {
+                            "timeline": {
+                                "timeline": {
+                                    "instructions": [
+                                        {"type": "TimelineClearCache"},
+                                        {
+                                            "type": "TimelineAddEntries",
+                                            "entries": entries,
+                                        },
+                                    ]
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        )
+
+    return pages
+
+
+def make_scores(n, seed=67):
+    "Ascending epoch-second timestamps and compound scores in [-1, 1]"
+
+    rng = np.random.default_rng(seed)
+    timestamps = np.sort(rng.integers(0, FIFTEEN_YEARS, n)) + START.timestamp()
+    # drifting mood so the darkest period is not just noise
+    drift = np.sin(np.linspace(0, 12 * np.pi, n))
+    scores = np.clip(0.5 * drift + rng.normal(0, 0.5, n), -1, 1)
+
+    return timestamps, scores
+
+
+def make_tiny_model(path, seed=67):
+    """A randomly initialised 2-layer RoBERTa classifier saved to ``path``.
+
+    Small enough to build and run offline in seconds. It has the real
+    model's labels and tokenizer setup, so ``infer_sentiment`` runs its
+    full tokenize -> bucket -> forward -> softmax path. Scores are
+    meaningless, only the timings are.
+    """
+
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors, trainers
+    from transformers import (
+        PreTrainedTokenizerFast,
+        RobertaConfig,
+        RobertaForSequenceClassification,
+    )
+
+    torch.manual_seed(seed)
+
+    special = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.train_from_iterator(
+        make_texts(5000, seed),
+        trainers.BpeTrainer(
+            vocab_size=2000,
+            special_tokens=special,
+            initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+        ),
+    )
+
+    tokenizer.post_processor = processors.RobertaProcessing(
+        ("</s>", tokenizer.token_to_id("</s>")), ("<s>", tokenizer.token_to_id("<s>"))
+    )
+
+    fast = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        bos_token="<s>",
+        eos_token="</s>",
+        unk_token="<unk>",
+        pad_token="<pad>",
+        mask_token="<mask>",
+        model_max_length=512,
+    )
+    fast.save_pretrained(path)
+
+    config = RobertaConfig(
+        vocab_size=len(fast),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=514,
+        pad_token_id=fast.pad_token_id,
+        bos_token_id=fast.bos_token_id,
+        eos_token_id=fast.eos_token_id,
+        num_labels=3,
+        id2label={0: "negative", 1: "neutral", 2: "positive"},
+        label2id={"negative": 0, "neutral": 1, "positive": 2},
+    )
+    RobertaForSequenceClassification(config).save_pretrained(path)
+
+    return path
@@ -0,0 +1,338 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.fixtures import (
+    make_created_at,
+    make_scores,
+    make_texts,
+    make_timeline,
+    make_tiny_model,
+    make_tweet_legacies,
+)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+# each benchmark builds its fixture for ``n`` items and returns
+# (setup, run): setup() is untimed and its result is passed to run()
+def bench_process_instructions(n):
+
+    from scraping.process import Process
+
+    timeline = make_timeline(n)
+
+    def setup():
+        process = Process()
+        process.upload_data(timeline)
+        return process
+
+    return setup, lambda process: process.process_instructions()
+
+
+def bench_extract_tweet_info(n):
+
+    from scraping.process import Process
+
+    legacies = make_tweet_legacies(n)
+    process = Process()
+
+    def run(_):
+        for legacy in legacies:
+            process.extract_tweet_info(legacy)
+
+    return lambda: None, run
+
+
+def bench_created_at_to_epoch(n):
+
+    from scraping.process import created_at_to_epoch
+
+    values = make_created_at(n)
+
+    return lambda: None, lambda _: created_at_to_epoch(values)
+
+
+def bench_clean_text(n):
+
+    from analysis.text import clean_text
+
+    texts = make_texts(n)
+
+    return lambda: None, lambda _: [clean_text(text) for text in texts]
+
+
+def bench_find_darkest_period(n):
+
+    from analysis.periods import find_darkest_period
+
+    timestamps, scores = make_scores(n)
+
+    return lambda: None, lambda _: find_darkest_period(timestamps, scores)
+
+
+def bench_preprocess_text(n):
+
+    from sentiment_analysis.data_cleaning.clean_data import (
+        preprocess_text,
+        remove_handles,
+    )
+
+    texts = [remove_handles(text) for text in make_texts(n)]
+
+    return lambda: None, lambda _: [preprocess_text(text) for text in texts]
+
+
+def bench_fast_preprocess_text(n):
+
+    from sentiment_analysis.data_cleaning.clean_data import (
+        fast_preprocess_text,
+        remove_handles,
+    )
+
+    texts = [remove_handles(text) for text in make_texts(n)]
+
+    return lambda: None, lambda _: [fast_preprocess_text(text) for text in texts]
+
+
+@functools.lru_cache(maxsize=None)
+def tiny_model():
+
+    from sentiment_analysis.pretrained.pipeline.inference import infer_sentiment
+
+    model_dir = make_tiny_model(tempfile.mkdtemp(prefix="tiny-roberta-"))
+    model = infer_sentiment(model_id=model_dir)
+
+    # first call pays for lazy init, keep it out of the timings
+    model.batch_scores(make_texts(32))
+
+    return model
+
+
+def bench_batch_scores(n):
+
+    model = tiny_model()
+    texts = make_texts(n)
+
+    return lambda: None, lambda _: model.batch_scores(texts)
+
+
+# name -> (benchmark, largest n it runs at unless --full)
+BENCHMARKS = {
+    "Process.process_instructions": (bench_process_instructions, None),
+    "Process.extract_tweet_info": (bench_extract_tweet_info, None),
+    "created_at_to_epoch": (bench_created_at_to_epoch, None),
+    "app.clean_text": (bench_clean_text, None),
+    "find_darkest_period": (bench_find_darkest_period, None),
+    "clean_data.preprocess_text": (bench_preprocess_text, 100_000),
+    "clean_data.fast_preprocess_text": (bench_fast_preprocess_text, None),
+    "infer_sentiment.batch_scores": (bench_batch_scores, 10_000),
+}
+
+
+def time_benchmark(benchmark, n, repeat):
+
+    setup, run = benchmark(n)
+
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    median = statistics.median(times)
+
+    return {
+        "repeat": repeat,
+        "best_s": round(best, 6),
+        "median_s": round(median, 6),
+        "per_item_us": round(median / n * 1e6, 3),
+        "items_per_s": round(n / median, 1) if median else None,
+    }
+
+
+def git_info():
+
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, repeat=3, full=False):
+    """Time every benchmark at every size in ``sizes``.
+
+    Benchmarks whose dependencies are missing (torch, NLTK data, ...) are
+    recorded as skipped rather than failing the run, as are sizes above a
+    benchmark's cap unless ``full`` is set.
+    """
+
+    results = []
+
+    for name, (benchmark, max_n) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+
+        for n in sizes:
+            row = {"name": name, "n": n}
+
+            if max_n is not None and n > max_n and not full:
+                row["skipped"] = f"n > {max_n}, use --full"
+            else:
+                try:
+                    row.update(time_benchmark(benchmark, n, repeat))
+                except (ImportError, LookupError, OSError) as e:
+                    row["skipped"] = f"{type(e).__name__}: {e}"
+
+            results.append(row)
+            print(format_row(row), flush=True)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_info(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": list(sizes),
+        "results": results,
+    }
+
+
+def format_row(row):
+
+    label = f"{row['name']:<34} n={row['n']:<9}"
+
+    if "skipped" in row:
+        return f"{label} skipped ({row['skipped'].splitlines()[0]})"
+
+    return (
+        f"{label} {row['median_s']:>10.4f}s median "
+        f"{row['per_item_us']:>10.2f} us/item"
+    )
+
+
+def compare(base, current, threshold=1.2):
+    """Print median-time ratios of ``current`` over ``base`` per benchmark/size.
+
+    Returns the rows slower than ``threshold`` times the base.
+    """
+
+    base_times = {
+        (row["name"], row["n"]): row["median_s"]
+        for row in base["results"]
+        if "median_s" in row
+    }
+    regressions = []
+
+    print(f"\n{'benchmark':<34} {'n':>9} {'base':>10} {'current':>10} {'ratio':>7}")
+
+    for row in current["results"]:
+        key = (row["name"], row["n"])
+        if "median_s" not in row or key not in base_times:
+            continue
+
+        ratio = row["median_s"] / base_times[key] if base_times[key] else float("inf")
+        flag = "  <-- slower" if ratio > threshold else ""
+
+        print(
+            f"{row['name']:<34} {row['n']:>9} {base_times[key]:>10.4f} "
+            f"{row['median_s']:>10.4f} {ratio:>7.2f}{flag}"
+        )
+
+        if ratio > threshold:
+            regressions.append(
+                {**row, "base_median_s": base_times[key], "ratio": ratio}
+            )
+
+    return regressions
+
+
+def default_output(report):
+
+    git = report["git"]
+    branch = (git["branch"] or "unknown").replace("/", "-")
+    commit = (git["commit"] or "unknown")[:8]
+
+    return RESULTS_DIR / f"{branch}-{commit}{'-dirty' if git['dirty'] else ''}.json"
+
+
+def main(argv=None):
+
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark the scraping, cleaning, period and scoring hot paths"
+    )
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="1000 ... 1000000"
+    )
+    arg_parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run"
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--full", action="store_true", help="ignore the size caps of slow benchmarks"
+    )
+    arg_parser.add_argument("--output", help="results JSON path")
+    arg_parser.add_argument("--compare", help="baseline results JSON to compare to")
+    arg_parser.add_argument(
+        "--current", help="compare this results JSON instead of running"
+    )
+    arg_parser.add_argument(
+        "--threshold", type=float, default=1.2, help="slowdown ratio to fail on"
+    )
+    args = arg_parser.parse_args(argv)
+
+    if args.current:
+        with open(args.current, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        report = run_benchmarks(args.sizes, args.only, args.repeat, args.full)
+
+        output = Path(args.output) if args.output else default_output(report)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        print(f"\n[ok] Saved benchmark results to: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            base = json.load(f)
+
+        regressions = compare(base, report, args.threshold)
+
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed past {args.threshold}x")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-setuid-sandbox",
+]
+
+
+class PooledBrowser:
+
+    def __init__(self, browser):
+
+        self.browser = browser
+        self.uses = 0
+        self.last_used = time.monotonic()
+        self.in_use = False
+
+    def healthy(self):
+
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+    def close(self):
+
+        try:
+            self.browser.close()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Keeps up to ``size`` warm Chromium instances and lends out fresh contexts.
+
+    Every ``acquire`` gets its own browser context, so cookies and storage are
+    isolated between scrapes while the browser process itself is reused.
+    Browsers are relaunched after ``max_uses`` contexts or when they stop
+    responding, and idle ones are closed after ``idle_timeout`` seconds.
+
+    Playwright's sync API is bound to the thread that started it, so a pool
+    must be used from the thread that created it.
+    """
+
+    def __init__(self, size=2, max_uses=20, idle_timeout=300, headless=True):
+
+        self.size = size
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.headless = headless
+        self.browsers = []
+        self.lock = threading.Lock()
+        self.available = threading.Condition(self.lock)
+        self.playwright = None
+
+    def start(self):
+
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+
+        return self
+
+    def launch(self):
+
+        browser = self.playwright.chromium.launch(
+            headless=self.headless, args=LAUNCH_ARGS
+        )
+        return PooledBrowser(browser)
+
+    def warm_up(self, n=None):
+
+        self.start()
+
+        with self.lock:
+            while len(self.browsers) < min(n or self.size, self.size):
+                self.browsers.append(self.launch())
+
+        return self
+
+    def evict_idle(self):
+
+        now = time.monotonic()
+
+        with self.lock:
+            for pooled in list(self.browsers):
+                if not pooled.in_use and now - pooled.last_used > self.idle_timeout:
+                    self.browsers.remove(pooled)
+                    pooled.close()
+
+    def _checkout(self, timeout):
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.available:
+            while True:
+                for pooled in list(self.browsers):
+                    if pooled.in_use:
+                        continue
+
+                    if not pooled.healthy() or pooled.uses >= self.max_uses:
+                        self.browsers.remove(pooled)
+                        pooled.close()
+                        continue
+
+                    pooled.in_use = True
+                    return pooled
+
+                if len(self.browsers) < self.size:
+                    pooled = self.launch()
+                    pooled.in_use = True
+                    self.browsers.append(pooled)
+                    return pooled
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("no browser available in the pool")
+
+                self.available.wait(remaining)
+
+    def _checkin(self, pooled):
+
+        with self.available:
+            pooled.in_use = False
+            pooled.uses += 1
+            pooled.last_used = time.monotonic()
+            self.available.notify()
+
+    @contextmanager
+    def acquire(self, timeout=None, **context_kwargs):
+
+        self.start()
+        self.evict_idle()
+
+        pooled = self._checkout(timeout)
+        ctx = None
+
+        try:
+            ctx = pooled.browser.new_context(**context_kwargs)
+            yield pooled.browser, ctx
+
+        finally:
+            if ctx is not None:
+                try:
+                    ctx.close()
+                except Exception:
+                    pass
+
+            self._checkin(pooled)
+
+    def close(self):
+
+        with self.lock:
+            for pooled in self.browsers:
+                pooled.close()
+            self.browsers = []
+
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+    def __enter__(self):
+
+        return self.start()
+
+    def __exit__(self, *exc):
+
+        self.close()
@@ -0,0 +1,209 @@
+from datetime import timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+COUNT_COLUMNS = ["retweet_count", "favorite_count", "reply_count", "quote_count"]
+
+SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("text", pa.string()),
+        ("created_at", pa.timestamp("s", tz="UTC")),
+        ("created_at_raw", pa.string()),
+        ("retweet_count", pa.int64()),
+        ("favorite_count", pa.int64()),
+        ("reply_count", pa.int64()),
+        ("quote_count", pa.int64()),
+        ("lang", pa.dictionary(pa.int16(), pa.string())),
+        ("in_reply_to_status_id", pa.int64()),
+        ("in_reply_to_user_id", pa.int64()),
+        ("in_reply_to_screen_name", pa.string()),
+        ("is_quote", pa.bool_()),
+        ("quote_row", pa.int32()),
+    ]
+)
+
+
+def _int_or_none(value):
+    return int(value) if value not in (None, "") else None
+
+
+class TweetTable:
+    """Column-oriented copy of ``Process.all_tweets_combined``.
+
+    Main tweets come first, quoted tweets are appended after them with
+    ``is_quote`` set, and a main tweet's ``quote_row`` is the row index of
+    its quote (``-1`` when it has none). ``created_at`` values that did not
+    parse are kept verbatim in ``created_at_raw``, which is null otherwise.
+    """
+
+    def __init__(self, table):
+
+        self.table = table
+
+    def __len__(self):
+
+        return self.table.num_rows
+
+    @classmethod
+    def from_records(cls, combined_tweets):
+
+        rows = list(combined_tweets)
+        quotes = [tweet["quote"] for tweet in rows if tweet.get("quote")]
+        all_rows = rows + quotes
+
+        quote_row = np.full(len(all_rows), -1, dtype=np.int32)
+        next_quote = len(rows)
+        for i, tweet in enumerate(rows):
+            if tweet.get("quote"):
+                quote_row[i] = next_quote
+                next_quote += 1
+
+        is_quote = np.zeros(len(all_rows), dtype=bool)
+        is_quote[len(rows) :] = True
+
+        created_at = np.array(
+            [tweet.get("created_at_timestamp") or 0 for tweet in all_rows],
+            dtype=np.int64,
+        )
+
+        columns = {
+            "id": pa.array(
+                [_int_or_none(t.get("id")) for t in all_rows], type=pa.int64()
+            ),
+            "text": pa.array([t.get("text", "") for t in all_rows], type=pa.string()),
+            "created_at": pa.array(
+                created_at, type=pa.timestamp("s", tz="UTC"), mask=created_at == 0
+            ),
+            "created_at_raw": pa.array(
+                [
+                    t.get("created_at") or None if stamp == 0 else None
+                    for t, stamp in zip(all_rows, created_at)
+                ],
+                type=pa.string(),
+            ),
+            "lang": pa.array(
+                [t.get("lang", "") for t in all_rows], type=pa.string()
+            ).dictionary_encode(),
+            "in_reply_to_status_id": pa.array(
+                [_int_or_none(t.get("in_reply_to_status_id")) for t in all_rows],
+                type=pa.int64(),
+            ),
+            "in_reply_to_user_id": pa.array(
+                [_int_or_none(t.get("in_reply_to_user_id")) for t in all_rows],
+                type=pa.int64(),
+            ),
+            "in_reply_to_screen_name": pa.array(
+                [t.get("in_reply_to_screen_name") or None for t in all_rows],
+                type=pa.string(),
+            ),
+            "is_quote": pa.array(is_quote),
+            "quote_row": pa.array(quote_row),
+        }
+
+        for name in COUNT_COLUMNS:
+            columns[name] = pa.array(
+                np.array([t.get(name) or 0 for t in all_rows], dtype=np.int64)
+            )
+
+        columns["lang"] = columns["lang"].cast(SCHEMA.field("lang").type)
+
+        return cls(pa.table([columns[f.name] for f in SCHEMA], schema=SCHEMA))
+
+    @classmethod
+    def from_process(cls, proc):
+
+        return cls.from_records(proc.all_tweets_combined)
+
+    def column(self, name):
+        """NumPy view of a column, zero-copy for the null-free numeric ones."""
+
+        chunked = self.table.column(name).combine_chunks()
+
+        if name == "created_at":
+            return chunked.to_numpy(zero_copy_only=False)
+
+        if pa.types.is_integer(chunked.type) and chunked.null_count == 0:
+            return chunked.to_numpy(zero_copy_only=True)
+
+        return chunked.to_numpy(zero_copy_only=False)
+
+    def main_tweets(self):
+
+        return TweetTable(self.table.filter(pc.invert(self.table["is_quote"])))
+
+    def to_pandas(self, main_only=True):
+
+        table = self.main_tweets().table if main_only else self.table
+        return table.to_pandas(split_blocks=True, self_destruct=False)
+
+    def to_records(self):
+        """Rebuild the ``all_tweets_combined`` list of dicts."""
+
+        rows = self.table.to_pylist()
+
+        def as_dict(row):
+            created_at = row["created_at"]
+            return {
+                "id": str(row["id"]) if row["id"] is not None else "",
+                "text": row["text"],
+                "created_at": (
+                    created_at.isoformat() if created_at else row.get("created_at_raw")
+                ),
+                "created_at_timestamp": (
+                    created_at.replace(tzinfo=timezone.utc).timestamp()
+                    if created_at
+                    else 0
+                ),
+                **{name: row[name] for name in COUNT_COLUMNS},
+                "lang": row["lang"],
+                "in_reply_to_status_id": (
+                    str(row["in_reply_to_status_id"])
+                    if row["in_reply_to_status_id"] is not None
+                    else ""
+                ),
+                "in_reply_to_user_id": (
+                    str(row["in_reply_to_user_id"])
+                    if row["in_reply_to_user_id"] is not None
+                    else ""
+                ),
+                "in_reply_to_screen_name": row["in_reply_to_screen_name"] or "",
+            }
+
+        records = []
+        for row in rows:
+            if row["is_quote"]:
+                continue
+
+            record = as_dict(row)
+            record["quote"] = (
+                as_dict(rows[row["quote_row"]]) if row["quote_row"] >= 0 else None
+            )
+            records.append(record)
+
+        return records
+
+    def write_parquet(self, path, compression="zstd"):
+
+        pq.write_table(self.table, path, compression=compression)
+
+    @classmethod
+    def read_parquet(cls, path, columns=None):
+
+        return cls(pq.read_table(path, columns=columns))
+
+    def write_arrow(self, path):
+
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, self.table.schema) as writer:
+                writer.write_table(self.table)
+
+    @classmethod
+    def read_arrow(cls, path):
+
+        # memory-mapped, so columns are read straight from the page cache
+        with pa.memory_map(path, "r") as source:
+            return cls(pa.ipc.open_file(source).read_all())
@@ -1,4 +1,5 @@
 from scrape import Scraper
+from browser_pool import BrowserPool
 import json
 import time
 
@@ -20,5 +21,25 @@ def demo():
     print(f"   Max scrolls: {small_scraper.MAX_SCROLLS}")
 
 
+def demo_pool(users=("elonmusk", "nasa")):
+
+    # one warm browser serves every handle, each scrape gets its own context
+    with BrowserPool(size=1) as pool:
+
+        for user in users:
+
+            scraper = Scraper(
+                user=user,
+                max_tweets=10,
+                max_scrolls=3,
+                scroll_pause_min=1,
+                scroll_pause_max=2,
+                browser_pool=pool,
+            )
+
+            scraper.scrape_and_process(user)
+            scraper.download(type=["all"], path="./")
+
+
 if __name__ == "__main__":
     demo()
@@ -0,0 +1,21 @@
+import json
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def with_cursor(url, cursor, count=None):
+    """Rebuild a captured GraphQL timeline URL so it asks for the page at ``cursor``."""
+
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    rebuilt = []
+    for key, value in query:
+        if key == "variables":
+            variables = json.loads(value)
+            variables["cursor"] = cursor
+            if count is not None:
+                variables["count"] = count
+            value = json.dumps(variables, separators=(",", ":"))
+        rebuilt.append((key, value))
+
+    return urlunsplit(parts._replace(query=urlencode(rebuilt)))
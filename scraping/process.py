@@ -1,7 +1,25 @@
 import json
+import re
 import datetime
 from dateutil import parser
 
+ARRAY_SEPARATOR_RE = re.compile(r"[\s,]*")
+
+MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
 
 def test_json_keys(*args):
     args_list = list(args)[1:]
@@ -27,6 +45,249 @@ def test_json_keys(*args):
     return True
 
 
+def parse_created_at(value):
+    # Twitter always sends "Wed Oct 10 20:19:24 +0000 2018", so slice it
+    # directly and only fall back to dateutil for anything else
+    parts = value.split(" ")
+
+    if len(parts) == 6 and parts[1] in MONTHS and len(parts[3]) == 8:
+        try:
+            offset = parts[4]
+            if offset == "+0000":
+                tz = datetime.timezone.utc
+            else:
+                minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+                sign = -1 if offset[0] == "-" else 1
+                tz = datetime.timezone(datetime.timedelta(minutes=sign * minutes))
+
+            clock = parts[3]
+            return datetime.datetime(
+                int(parts[5]),
+                MONTHS[parts[1]],
+                int(parts[2]),
+                int(clock[0:2]),
+                int(clock[3:5]),
+                int(clock[6:8]),
+                tzinfo=tz,
+            )
+        except ValueError:
+            pass
+
+    return parser.parse(value)
+
+
+def _days_from_civil(year, month, day):
+    # proleptic Gregorian date -> days since 1970-01-01, works on arrays
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + 12 * (month <= 2) - 3) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def created_at_to_epoch(values):
+    """Convert a column of ``created_at`` strings to epoch seconds (float64).
+
+    Well-formed values are decoded together with NumPy by slicing the fixed
+    character positions; anything else goes through ``parse_created_at`` one
+    at a time, and values that cannot be parsed become 0.
+    """
+    import numpy as np
+
+    values = list(values)
+    n = len(values)
+    epoch = np.zeros(n, dtype=np.float64)
+
+    if not n:
+        return epoch
+
+    # U30 truncates longer strings, so measure the originals
+    lengths = np.fromiter(
+        (len(v) if isinstance(v, str) else 0 for v in values), np.int64, n
+    )
+    text = np.array([v if isinstance(v, str) else "" for v in values], dtype="U30")
+    chars = text.view(np.uint32).reshape(n, 30)
+    digits = chars.astype(np.int64) - ord("0")
+
+    def number(lo, hi):
+        out = np.zeros(n, dtype=np.int64)
+        for i in range(lo, hi):
+            out = out * 10 + digits[:, i]
+        return out
+
+    month_key = chars[:, 4] * 65536 + chars[:, 5] * 256 + chars[:, 6]
+    month = np.zeros(n, dtype=np.int64)
+    for name, number_of_month in MONTHS.items():
+        key = ord(name[0]) * 65536 + ord(name[1]) * 256 + ord(name[2])
+        month[month_key == key] = number_of_month
+
+    digit_cols = [8, 9, 11, 12, 14, 15, 17, 18, 21, 22, 23, 24, 26, 27, 28, 29]
+    valid = (
+        (lengths == 30)
+        & (month > 0)
+        & np.all((digits[:, digit_cols] >= 0) & (digits[:, digit_cols] <= 9), axis=1)
+        & np.all(chars[:, [3, 7, 10, 19, 25]] == ord(" "), axis=1)
+        & np.all(chars[:, [13, 16]] == ord(":"), axis=1)
+        & np.all(chars[:, 0:3] != ord(" "), axis=1)
+        & np.isin(chars[:, 20], [ord("+"), ord("-")])
+    )
+
+    year = number(26, 30)
+    day = number(8, 10)
+    hour, minute, second = number(11, 13), number(14, 16), number(17, 19)
+    offset_minutes = number(21, 23) * 60 + number(23, 25)
+
+    # whatever datetime() would reject is left to the scalar parser
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    valid &= (
+        (year >= 1)
+        & (day >= 1)
+        & (day <= month_days[month] + (leap & (month == 2)))
+        & (hour < 24)
+        & (minute < 60)
+        & (second < 60)
+        & (offset_minutes < 24 * 60)
+    )
+
+    sign = np.where(chars[:, 20] == ord("-"), -1, 1)
+
+    seconds = (
+        _days_from_civil(year, np.maximum(month, 1), day) * 86400
+        + hour * 3600
+        + minute * 60
+        + second
+        - sign * offset_minutes * 60
+    )
+    epoch[valid] = seconds[valid]
+
+    # missing values (None, NaN from pandas) and other non-strings stay 0
+    for i in np.flatnonzero(~valid):
+        if isinstance(values[i], str) and values[i]:
+            try:
+                epoch[i] = parse_created_at(values[i]).timestamp()
+            except (ValueError, OverflowError, TypeError):
+                pass
+
+    return epoch
+
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """Yield the elements of a top-level JSON array without loading the file.
+
+    Memory stays around one element plus one read chunk. A file holding a
+    single object instead of an array yields that object.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size).lstrip()
+        eof = not buffer
+
+        if buffer.startswith("{"):
+            yield json.loads(buffer + f.read())
+            return
+
+        if not buffer.startswith("["):
+            if eof:
+                return
+            raise ValueError(f"{path} does not contain a JSON array")
+
+        # walk the buffer by index, it is only sliced when refilled
+        pos = 1
+        read_size = chunk_size
+
+        while True:
+            pos = ARRAY_SEPARATOR_RE.match(buffer, pos).end()
+
+            if buffer.startswith("]", pos):
+                return
+
+            if pos < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # a number running into the end of the buffer may be cut off
+                    if end < len(buffer) or eof:
+                        yield item
+                        pos = end
+                        read_size = chunk_size
+                        continue
+
+            if eof:
+                raise ValueError(f"{path} ends before the JSON array is closed")
+
+            # grow reads for oversized elements so retries stay linear overall
+            buffer = buffer[pos:]
+            pos = 0
+            chunk = f.read(max(read_size, len(buffer)))
+            eof = not chunk
+            buffer += chunk
+            read_size *= 2
+
+
+def get_timeline_instructions(item):
+    if isinstance(item, dict) and test_json_keys(
+        item, "data", "user", "result", "timeline", "timeline", "instructions"
+    ):
+        return item["data"]["user"]["result"]["timeline"]["timeline"]["instructions"]
+    return []
+
+
+def iter_timeline_entries(item):
+    for instruction in get_timeline_instructions(item):
+        if instruction.get("type") == "TimelineAddEntries":
+            yield from instruction.get("entries", [])
+        elif instruction.get("type") == "TimelineReplaceEntry":
+            if "entry" in instruction:
+                yield instruction["entry"]
+
+
+def is_tweet_entry(entry):
+    content = entry.get("content", {})
+    return (
+        content.get("entryType") == "TimelineTimelineItem"
+        and content.get("itemContent", {}).get("itemType") == "TimelineTweet"
+    )
+
+
+def entry_tweet_id(entry):
+    result = (
+        entry.get("content", {})
+        .get("itemContent", {})
+        .get("tweet_results", {})
+        .get("result", {})
+    )
+    return result.get("legacy", {}).get("id_str") or None
+
+
+def timeline_tweet_ids(item):
+    return [
+        entry_tweet_id(entry)
+        for entry in iter_timeline_entries(item)
+        if is_tweet_entry(entry) and entry_tweet_id(entry)
+    ]
+
+
+def count_timeline_tweets(item):
+    return sum(1 for entry in iter_timeline_entries(item) if is_tweet_entry(entry))
+
+
+def get_bottom_cursor(item):
+    for entry in iter_timeline_entries(item):
+        content = entry.get("content", {})
+        if (
+            content.get("entryType") == "TimelineTimelineCursor"
+            and content.get("cursorType") == "Bottom"
+        ):
+            return content.get("value")
+    return None
+
+
 class Process:
     def __init__(self, data_type=None):
         self.data = []
@@ -34,6 +295,8 @@ class Process:
         self.tweets = []
         self.tweets_with_quotes = []
         self.all_tweets_combined = []
+        self.tweet_index = {}
+        self.page_stats = []
 
     def get_data_type_off_input(self, data, additional_info=None) -> bool:
         if type(data) is str:
@@ -66,7 +329,7 @@ class Process:
 
         if created_at_raw:
             try:
-                created_at_parsed = parser.parse(created_at_raw)
+                created_at_parsed = parse_created_at(created_at_raw)
                 created_at_iso = created_at_parsed.isoformat()
             except:
                 created_at_iso = created_at_raw
@@ -88,13 +351,17 @@ class Process:
             "in_reply_to_screen_name": tweet_legacy.get("in_reply_to_screen_name", ""),
         }
 
-    def process_tweet_entry(self, entry):
+    def process_tweet_entry(self, entry, materialize=True):
         tweets_found = []
 
         if entry.get("content", {}).get("itemContent", {}).get("tweet_results", {}):
             tweet_result = entry["content"]["itemContent"]["tweet_results"]["result"]
 
             if "legacy" in tweet_result:
+                tweet_id = tweet_result["legacy"].get("id_str", "")
+                if tweet_id and tweet_id in self.tweet_index:
+                    return tweets_found
+
                 main_tweet = self.extract_tweet_info(tweet_result["legacy"])
                 quoted_tweet = None
 
@@ -102,63 +369,89 @@ class Process:
                     quoted_result = tweet_result["quoted_status_result"]["result"]
                     if "legacy" in quoted_result:
                         quoted_tweet = self.extract_tweet_info(quoted_result["legacy"])
-                        self.tweets_with_quotes.append(
-                            {"main_tweet": main_tweet, "quoted_tweet": quoted_tweet}
-                        )
+                        if materialize:
+                            self.tweets_with_quotes.append(
+                                {"main_tweet": main_tweet, "quoted_tweet": quoted_tweet}
+                            )
 
                 tweets_found.append(
                     {"type": "main", "tweet": main_tweet, "quoted_tweet": quoted_tweet}
                 )
 
-                combined_tweet = main_tweet.copy()
-                combined_tweet["quote"] = quoted_tweet if quoted_tweet else None
-                self.all_tweets_combined.append(combined_tweet)
+                # streaming callers only need the id for dedup, not a row
+                if main_tweet["id"]:
+                    self.tweet_index[main_tweet["id"]] = (
+                        len(self.tweets) if materialize else None
+                    )
+
+                if materialize:
+                    combined_tweet = main_tweet.copy()
+                    combined_tweet["quote"] = quoted_tweet if quoted_tweet else None
+                    self.all_tweets_combined.append(combined_tweet)
+                    self.tweets.append(main_tweet)
 
         return tweets_found
 
     def get_instructions(self):
+        instructions = []
         for item in self.data:
-            if isinstance(item, dict) and "data" in item:
-                success = test_json_keys(
-                    item,
-                    "data",
-                    "user",
-                    "result",
-                    "timeline",
-                    "timeline",
-                    "instructions",
-                )
-                if success:
-                    timeline_data = item["data"]["user"]["result"]["timeline"][
-                        "timeline"
-                    ]
-                    return timeline_data["instructions"]
-        return []
+            instructions.extend(get_timeline_instructions(item))
+        return instructions
+
+    def iter_response(self, item, materialize=True):
+        # merge one captured page, tweets already indexed count as duplicates
+        new_tweets = 0
+        duplicates = 0
+
+        for instruction in get_timeline_instructions(item):
+            if instruction.get("type") != "TimelineAddEntries":
+                continue
+
+            for entry in instruction.get("entries", []):
+                if not is_tweet_entry(entry):
+                    continue
+
+                tweets_found = self.process_tweet_entry(entry, materialize)
+
+                if tweets_found:
+                    new_tweets += 1
+                    yield tweets_found[0]
+                elif entry_tweet_id(entry) in self.tweet_index:
+                    duplicates += 1
+
+        self.page_stats.append(
+            {
+                "page": len(self.page_stats),
+                "new_tweets": new_tweets,
+                "duplicate_tweets": duplicates,
+            }
+        )
 
-    def process_instructions(self):
-        instructions = self.get_instructions()
-        all_tweets = []
-
-        for instruction in instructions:
-            if instruction.get("type") == "TimelineAddEntries":
-                entries = instruction.get("entries", [])
-
-                for entry in entries:
-                    if (
-                        entry.get("content", {}).get("entryType")
-                        == "TimelineTimelineItem"
-                    ):
-                        if (
-                            entry.get("content", {})
-                            .get("itemContent", {})
-                            .get("itemType")
-                            == "TimelineTweet"
-                        ):
-                            tweets_from_entry = self.process_tweet_entry(entry)
-                            all_tweets.extend(tweets_from_entry)
-
-        self.tweets = [tweet_data["tweet"] for tweet_data in all_tweets]
+    def add_response(self, item):
+        for _ in self.iter_response(item):
+            pass
+        return self.page_stats[-1]
+
+    def stream_tweets(self, source, materialize=False):
+        """Yield combined tweet records from a raw capture one page at a time.
+
+        ``source`` is a path to a ``_raw_tweets.json`` dump or any iterable of
+        responses. Only the current response is held in memory unless
+        ``materialize`` is set, in which case ``tweets`` and friends are filled
+        and sorted as usual once the generator is exhausted.
+        """
+        responses = iter_json_array(source) if isinstance(source, str) else source
+
+        for item in responses:
+            for tweet_data in self.iter_response(item, materialize):
+                combined_tweet = tweet_data["tweet"].copy()
+                combined_tweet["quote"] = tweet_data["quoted_tweet"]
+                yield combined_tweet
 
+        if materialize:
+            self.sort_tweets()
+
+    def sort_tweets(self):
         self.tweets.sort(key=lambda x: x["created_at_timestamp"], reverse=True)
         self.all_tweets_combined.sort(
             key=lambda x: x["created_at_timestamp"], reverse=True
@@ -166,16 +459,40 @@ class Process:
         self.tweets_with_quotes.sort(
             key=lambda x: x["main_tweet"]["created_at_timestamp"], reverse=True
         )
+        self.tweet_index = {
+            tweet["id"]: i for i, tweet in enumerate(self.tweets) if tweet["id"]
+        }
+
+    def process_instructions(self):
+        for item in self.data:
+            self.add_response(item)
+
+        self.sort_tweets()
 
         return {
             "total_tweets": len(self.tweets),
             "tweets_with_quotes": len(self.tweets_with_quotes),
             "combined_tweets": len(self.all_tweets_combined),
+            "pages": len(self.page_stats),
+            "duplicate_tweets": sum(p["duplicate_tweets"] for p in self.page_stats),
+            "page_stats": self.page_stats,
         }
 
-    def save_tweets(self, filename_prefix="tweets", save=True):
+    def to_table(self):
+        try:
+            from columnar import TweetTable
+        except ImportError:
+            from scraping.columnar import TweetTable
+
+        return TweetTable.from_process(self)
 
-        if save:
+    def save_tweets(self, filename_prefix="tweets", save=True, file_format="json"):
+
+        if save and file_format == "parquet":
+
+            self.to_table().write_parquet(f"{filename_prefix}_combined.parquet")
+
+        elif save:
 
             tweets_filename = f"{filename_prefix}_all.json"
 
@@ -193,15 +510,15 @@ class Process:
                 json.dump(self.all_tweets_combined, f, indent=2, ensure_ascii=False)
 
         return self.tweets, self.tweets_with_quotes, self.all_tweets_combined
-    
+
     def return_tweets(self, processed_type="all"):
         if processed_type == "all_types":
-        
+
             return self.tweets, self.tweets_with_quotes, self.all_tweets_combined
         elif processed_type == "all":
             return self.tweets
         elif processed_type == "with_quotes":
-        
+
             return self.tweets_with_quotes
         elif processed_type == "combined":
             return self.all_tweets_combined
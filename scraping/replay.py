@@ -0,0 +1,192 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+from playwright.async_api import async_playwright
+
+
+class TokenBucket:
+    """Paces requests at ``rate`` per second and slows down when throttled.
+
+    A 429 halves the refill rate and blocks new tokens until the server's
+    reset time; every success nudges the rate back towards the base rate.
+    """
+
+    def __init__(self, rate, capacity=1, min_rate=None, recovery=1.1):
+
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.capacity = capacity
+        self.recovery = recovery
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def from_delays(cls, delay_min, delay_max, **kwargs):
+
+        mean_delay = (delay_min + delay_max) / 2
+        return cls(1 / mean_delay if mean_delay > 0 else float("inf"), **kwargs)
+
+    def _refill(self, now):
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self._refill(now)
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, wait=None):
+
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+
+        if wait:
+            self.blocked_until = max(self.blocked_until, now + wait)
+
+    def reward(self):
+
+        self.rate = min(self.base_rate, self.rate * self.recovery)
+
+
+def retry_after_seconds(headers, default=None):
+    """Seconds to wait according to ``Retry-After`` or ``x-rate-limit-reset``."""
+
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(
+                    0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()
+                )
+            except (TypeError, ValueError):
+                pass
+
+    reset = headers.get("x-rate-limit-reset")
+    if reset:
+        try:
+            return max(0.0, float(reset) - time.time())
+        except ValueError:
+            pass
+
+    return default
+
+
+async def replay_requests(
+    requests,
+    storage_state=None,
+    user_agent=None,
+    delay_min=0.5,
+    delay_max=2,
+    concurrency=4,
+    max_retries=3,
+    on_response=None,
+):
+    """Replay captured ``(url, method, headers)`` tuples concurrently.
+
+    Returns the JSON bodies of successful responses in capture order.
+    ``on_response`` is called with each body in arrival order, on one
+    background thread rather than the event loop, so it may block (e.g. on a
+    full queue) without stalling the other fetches. Like ``replay_sync``, a
+    failing request or callback is reported and skipped, never fatal.
+    """
+
+    bucket = TokenBucket.from_delays(delay_min, delay_max)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * len(requests)
+    loop = asyncio.get_running_loop()
+    callbacks = ThreadPoolExecutor(max_workers=1) if on_response else None
+    delivered = []
+
+    def deliver(data):
+
+        try:
+            on_response(data)
+        except Exception as e:
+            print(f"Error in response callback: {e}")
+
+    async with async_playwright() as p:
+
+        api = await p.request.new_context(
+            storage_state=storage_state, user_agent=user_agent
+        )
+
+        async def fetch(i, url, method, headers):
+
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    await bucket.acquire()
+
+                    try:
+                        r = await api.fetch(url, method=method, headers=headers)
+                    except Exception:
+                        bucket.penalize()
+                        await asyncio.sleep(random.uniform(2, 5))
+                        continue
+
+                    if r.status == 200:
+                        try:
+                            data = await r.json()
+                        except Exception as e:
+                            print(f"Error reading replayed response: {e}")
+                            return
+
+                        bucket.reward()
+                        results[i] = data
+                        if callbacks is not None:
+                            delivered.append(
+                                loop.run_in_executor(callbacks, deliver, data)
+                            )
+                        return
+
+                    if r.status == 429:
+                        bucket.penalize(retry_after_seconds(r.headers, default=15))
+                        continue
+
+                    return
+
+        try:
+            outcomes = await asyncio.gather(
+                *(
+                    fetch(i, url, method, headers)
+                    for i, (url, method, headers) in enumerate(requests)
+                ),
+                return_exceptions=True,
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    print(f"Error during replay: {outcome}")
+
+            await asyncio.gather(*delivered)
+
+        finally:
+            if callbacks is not None:
+                callbacks.shutdown(wait=False)
+            await api.dispose()
+
+    return [data for data in results if data is not None]
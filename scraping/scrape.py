@@ -1,11 +1,32 @@
 from playwright.sync_api import sync_playwright
 import json, re, datetime, time, random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from process import Process
+from process import (
+    Process,
+    count_timeline_tweets,
+    get_bottom_cursor,
+    timeline_tweet_ids,
+)
+from replay import replay_requests, retry_after_seconds
+from pagination import with_cursor
+from browser_pool import BrowserPool, LAUNCH_ARGS
+from columnar import TweetTable
+from tweet_store import TweetStore
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0"
+)
+TIMELINE_PAGE_SIZE = 20
+CONTEXT_OPTIONS = {
+    "user_agent": USER_AGENT,
+    "viewport": {"width": 1920, "height": 1080},
+}
 
 
 class Scraper:
@@ -20,6 +41,13 @@ class Scraper:
         request_delay_max=2,
         max_scrolls=200,
         scroll_distance=4000,
+        replay_mode="sync",
+        replay_concurrency=4,
+        browser_pool=None,
+        pagination="scroll",
+        page_size=None,
+        tweet_store=None,
+        on_response=None,
     ):
 
         self.user = user
@@ -30,24 +58,21 @@ class Scraper:
         self.REQUEST_DELAY_MAX = request_delay_max
         self.MAX_SCROLLS = max_scrolls
         self.SCROLL_DISTANCE = scroll_distance
+        self.REPLAY_MODE = replay_mode
+        self.REPLAY_CONCURRENCY = replay_concurrency
+        self.browser_pool = browser_pool
+        self.PAGINATION = pagination
+        self.PAGE_SIZE = page_size
+        self.tweet_store = tweet_store
+        self.on_response = on_response
+        self.stop_at_id = None
         self.proc = Process()
 
     def setup_browser(self, p):
 
-        b = p.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--disable-setuid-sandbox",
-            ],
-        )
+        b = p.chromium.launch(headless=True, args=LAUNCH_ARGS)
 
-        ctx = b.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:91.0) Gecko/20100101 Firefox/91.0",
-            viewport={"width": 1920, "height": 1080},
-        )
+        ctx = b.new_context(**CONTEXT_OPTIONS)
 
         page = ctx.new_page()
         captured = []
@@ -125,65 +150,191 @@ class Scraper:
 
         return self.captured, page
 
-    def scrape(self):
-        start_time = time.time()
+    def emit(self, data):
+        # hand each response to a live consumer as soon as it arrives
+
+        if self.on_response is not None:
+            self.on_response(data)
+
+    def replay_sync(self, page, requests_to_process):
+
+        records = []
+        successful_requests = 0
+        failed_requests = 0
+
+        for i, req in enumerate(requests_to_process):
+            try:
+                if i > 0:
+                    delay = random.uniform(
+                        self.REQUEST_DELAY_MIN, self.REQUEST_DELAY_MAX
+                    )
+                    time.sleep(delay)
+
+                r = page.request.fetch(req.url, method=req.method, headers=req.headers)
+
+                if r.status == 200:
+                    data = r.json()
+                    records.append(data)
+                    self.emit(data)
+                    successful_requests += 1
+
+                else:
+                    failed_requests += 1
+                    if r.status == 429:
+                        time.sleep(60)
+
+            except Exception as e:
+                failed_requests += 1
+                time.sleep(random.uniform(2, 5))
+
+        return records
 
-        with sync_playwright() as p:
+    def capture_template(self, page, max_attempts=10):
 
-            b, ctx, page, captured, unique_requests = self.setup_browser(p)
-            self.captured = captured
-            self.unique_requests = unique_requests
+        page.goto(f"https://x.com/{self.user}", wait_until="networkidle")
 
-            page.on("request", self.log_request)
+        for _ in range(max_attempts):
+            for req in self.captured:
+                if "UserTweets" in req.url:
+                    return req
 
-            captured, page = self.browse(page)
+            page.mouse.wheel(0, self.SCROLL_DISTANCE)
+            page.wait_for_timeout(1000)
 
-            records = []
-            successful_requests = 0
-            failed_requests = 0
+        return None
 
-            requests_to_process = (
-                captured[: self.MAX_TWEETS]
-                if len(captured) > self.MAX_TWEETS
-                else captured
+    def paginate(self, page, template, max_retries=3):
+
+        records = []
+        seen_cursors = set()
+        cursor = None
+        tweet_count = 0
+        retries = 0
+
+        while tweet_count < self.MAX_TWEETS:
+
+            url = (
+                with_cursor(template.url, cursor, self.PAGE_SIZE)
+                if cursor
+                else template.url
             )
 
-            for i, req in enumerate(requests_to_process):
-                try:
-                    if i > 0:
-                        delay = random.uniform(
-                            self.REQUEST_DELAY_MIN, self.REQUEST_DELAY_MAX
-                        )
-                        time.sleep(delay)
+            try:
+                r = page.request.fetch(
+                    url, method=template.method, headers=template.headers
+                )
+            except Exception as e:
+                print(f"Error during pagination: {e}")
+                break
+
+            if r.status == 429 and retries < max_retries:
+                retries += 1
+                time.sleep(retry_after_seconds(r.headers, default=60))
+                continue
+
+            if r.status != 200:
+                break
+
+            retries = 0
+            data = r.json()
+            records.append(data)
+            self.emit(data)
+
+            page_tweets = count_timeline_tweets(data)
+            tweet_count += page_tweets
+            cursor = get_bottom_cursor(data)
+
+            if not page_tweets or cursor is None or cursor in seen_cursors:
+                break
+
+            # everything past this page is already in the tweet store
+            if self.stop_at_id is not None and any(
+                int(tweet_id) <= self.stop_at_id
+                for tweet_id in timeline_tweet_ids(data)
+            ):
+                break
+
+            seen_cursors.add(cursor)
+            time.sleep(random.uniform(self.REQUEST_DELAY_MIN, self.REQUEST_DELAY_MAX))
 
-                    r = page.request.fetch(
-                        req.url, method=req.method, headers=req.headers
-                    )
+        return records
 
-                    if r.status == 200:
-                        data = r.json()
-                        records.append(data)
-                        successful_requests += 1
+    def capture_and_replay(self, ctx, page):
 
-                    else:
-                        failed_requests += 1
-                        if r.status == 429:
-                            time.sleep(60)
+        self.captured = []
+        self.unique_requests = set()
 
-                except Exception as e:
-                    failed_requests += 1
-                    time.sleep(random.uniform(2, 5))
+        page.on("request", self.log_request)
 
-            ctx.close()
-            b.close()
+        if self.PAGINATION == "cursor":
+            # one captured UserTweets request is enough, the rest of the
+            # timeline is reached by following its bottom cursors
+            template = self.capture_template(page)
+            if template is None:
+                return [], None, None
+            return self.paginate(page, template), None, None
 
-            elapsed_time = time.time() - start_time
+        captured, page = self.browse(page)
+
+        requests_to_process = (
+            captured[: self.MAX_TWEETS] if len(captured) > self.MAX_TWEETS else captured
+        )
+
+        if self.REPLAY_MODE == "async":
+            # the async API cannot share the sync browser, so snapshot the
+            # requests and cookies and replay them once the browser is released
+            pending = [
+                (req.url, req.method, req.headers) for req in requests_to_process
+            ]
+            return None, pending, ctx.storage_state()
+
+        return self.replay_sync(page, requests_to_process), None, None
+
+    def scrape(self):
+        start_time = time.time()
 
-            self.raw_file = records
-            return records
+        if self.browser_pool is not None:
+
+            with self.browser_pool.acquire(**CONTEXT_OPTIONS) as (b, ctx):
+                page = ctx.new_page()
+                records, pending, storage_state = self.capture_and_replay(ctx, page)
+
+        else:
+
+            with sync_playwright() as p:
+
+                b, ctx, page, captured, unique_requests = self.setup_browser(p)
+                records, pending, storage_state = self.capture_and_replay(ctx, page)
+
+                ctx.close()
+                b.close()
+
+        if pending is not None:
+            coro = replay_requests(
+                pending,
+                storage_state=storage_state,
+                user_agent=USER_AGENT,
+                delay_min=self.REQUEST_DELAY_MIN,
+                delay_max=self.REQUEST_DELAY_MAX,
+                concurrency=self.REPLAY_CONCURRENCY,
+                on_response=self.emit,
+            )
+
+            # run on a fresh thread so no sync Playwright loop is in the way
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                records = executor.submit(asyncio.run, coro).result()
+
+        elapsed_time = time.time() - start_time
+
+        self.raw_file = records
+        return records
 
     def get_estimated_time(self):
 
+        if self.PAGINATION == "cursor":
+            pages = -(-self.MAX_TWEETS // (self.PAGE_SIZE or TIMELINE_PAGE_SIZE))
+            return pages * (self.REQUEST_DELAY_MIN + self.REQUEST_DELAY_MAX) / 2
+
         estimated_scroll_time = (
             self.MAX_SCROLLS * (self.SCROLL_PAUSE_MIN + self.SCROLL_PAUSE_MAX) / 2
         )
@@ -193,25 +344,58 @@ class Scraper:
         estimated_total = estimated_scroll_time + estimated_request_time
         return estimated_total
 
-    def scrape_and_process(self, user):
+    def set_outputs(self, combined_tweets):
 
-        estimated_scroll_time = (
-            self.MAX_SCROLLS * (self.SCROLL_PAUSE_MIN + self.SCROLL_PAUSE_MAX) / 2
-        )
-        estimated_request_time = (
-            self.MAX_TWEETS * (self.REQUEST_DELAY_MIN + self.REQUEST_DELAY_MAX) / 2
-        )
-        estimated_total = estimated_scroll_time + estimated_request_time
+        combined_tweets = combined_tweets[: self.MAX_TWEETS]
+
+        self.all_tweets_file = [
+            {k: v for k, v in tweet.items() if k != "quote"}
+            for tweet in combined_tweets
+        ]
+        self.quotes_file = [
+            {"main_tweet": main_tweet, "quoted_tweet": tweet["quote"]}
+            for main_tweet, tweet in zip(self.all_tweets_file, combined_tweets)
+            if tweet["quote"]
+        ]
+        self.combined_file = combined_tweets
+
+        return self.all_tweets_file, self.quotes_file, self.combined_file
+
+    def scrape_and_process(self, user, proc=None):
+        """Scrape ``user`` and turn the responses into tweet lists.
+
+        ``proc`` is a ``Process`` that ``on_response`` already fed every
+        response to. It is used as-is instead of parsing the records again.
+        """
+
+        estimated_total = self.get_estimated_time()
         print(f"Estimated total time: {estimated_total:.1f} seconds")
 
+        if self.tweet_store is not None:
+            # a short history cannot fill the request, keep paginating past it
+            meta = self.tweet_store.meta(user) or {}
+            if meta.get("count", 0) >= self.MAX_TWEETS:
+                self.stop_at_id = self.tweet_store.newest_id(user)
+
         records = self.scrape()
 
         if not records:
+            if self.tweet_store is not None and self.stop_at_id is not None:
+                return self.set_outputs(self.tweet_store.load(user))
             return None, None, None
 
-        proc = Process()
-        proc.upload_data(records)
+        if proc is None:
+            proc = Process()
+            proc.upload_data(records)
+
+        # a fed Process has no data left to add, this only sorts and counts
         processing_result = proc.process_instructions()
+        self.page_stats = proc.page_stats
+
+        if self.tweet_store is not None:
+            new_tweets = self.tweet_store.merge(user, proc.all_tweets_combined)
+            print(f"Merged {new_tweets} new tweets into the store for {user}")
+            return self.set_outputs(self.tweet_store.load(user))
 
         if processing_result["total_tweets"] > 0:
 
@@ -256,6 +440,12 @@ class Scraper:
 
                     json.dump(self.combined_file, f, indent=2, ensure_ascii=False)
 
+            elif t == "parquet":
+
+                TweetTable.from_records(self.combined_file).write_parquet(
+                    path + self.user + "_combined_tweets.parquet"
+                )
+
             elif t == "raw":
 
                 with open(
@@ -0,0 +1,143 @@
+import json
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from process import (
+    Process,
+    created_at_to_epoch,
+    iter_json_array,
+    parse_created_at,
+)
+
+
+def write_json(tmp_path, data, **kwargs):
+
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(data, **kwargs), encoding="utf-8")
+    return str(path)
+
+
+def test_iter_json_array_matches_json_load(tmp_path):
+
+    data = [
+        {"id_str": str(i), "full_text": "x" * (i % 97), "n": [i, i / 3]}
+        for i in range(2_000)
+    ]
+    data += [12345678901234567890, -1.5e-7, "tail", None, True, [], {}]
+
+    for kwargs in ({}, {"indent": 2}, {"separators": (",", ":")}):
+        path = write_json(tmp_path, data, **kwargs)
+
+        # tiny chunks put element and number boundaries at every offset
+        for chunk_size in (7, 64, 1 << 20):
+            assert list(iter_json_array(path, chunk_size)) == data
+
+    assert list(iter_json_array(write_json(tmp_path, []))) == []
+    assert list(iter_json_array(write_json(tmp_path, {"a": 1}))) == [{"a": 1}]
+
+
+def test_iter_json_array_is_linear(tmp_path):
+
+    path = write_json(tmp_path, [{"i": i} for i in range(200_000)])
+
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_json_array(path))
+    elapsed = time.perf_counter() - start
+
+    assert count == 200_000
+    # re-slicing the buffer per element made this ~20s
+    assert elapsed < 5, elapsed
+
+
+def scalar_epoch(value):
+
+    if not isinstance(value, str):
+        return 0.0
+
+    try:
+        return parse_created_at(value).timestamp()
+    except (ValueError, OverflowError, TypeError, AttributeError):
+        return 0.0
+
+
+def test_created_at_to_epoch_matches_scalar_parser():
+
+    values = [
+        "Wed Oct 10 20:19:24 +0000 2018",
+        "Thu Feb 29 23:59:59 +0000 2024",
+        "Wed Feb 29 12:00:00 +0000 2023",
+        "Wed Feb 30 12:00:00 +0000 2018",
+        "Wed Apr 31 12:00:00 +0000 2018",
+        "Wed Oct 00 12:00:00 +0000 2018",
+        "Wed Oct 10 24:00:00 +0000 2018",
+        "Wed Oct 10 20:60:24 +0000 2018",
+        "Wed Oct 10 20:19:24 +0530 2018",
+        "Wed Oct 10 20:19:24 -0800 2018",
+        "Wed Oct 10 20:19:24 +0000 0000",
+        "Wed Oct 10 20:19:24 +0000 2018 junk",
+        "Wedx Oct 10 20:19:24 +0000 2018",
+        "Wed Oct 10 20:19:24 +0000 2018",
+        "Wed Oct 10 20x19x24 +0000 2018",
+        "Wed Oct 10 20:19:24 +0000  2018",
+        "Wed Foo 10 20:19:24 +0000 2018",
+        "2018-10-10T20:19:24+00:00",
+        "",
+        None,
+        float("nan"),
+        1539202764,
+        b"Wed Oct 10 20:19:24 +0000 2018",
+    ]
+
+    # random single-character corruptions of well-formed values
+    rng = random.Random(67)
+    for _ in range(3000):
+        value = list(rng.choice(values[:2] + values[8:10]))
+        value[rng.randrange(len(value))] = rng.choice("0123456789 :+-xF")
+        values.append("".join(value))
+
+    assert created_at_to_epoch(values).tolist() == [scalar_epoch(v) for v in values]
+
+    # a pandas column with a missing value holds NaN, not None
+    column = pd.Series(["Wed Oct 10 20:19:24 +0000 2018", np.nan, None])
+    assert created_at_to_epoch(column).tolist() == [1539202764.0, 0.0, 0.0]
+
+
+def test_table_round_trip_keeps_unparsed_created_at():
+
+    proc = Process()
+    good = proc.extract_tweet_info(
+        {
+            "id_str": "1",
+            "full_text": "a",
+            "created_at": "Wed Oct 10 20:19:24 +0000 2018",
+        }
+    )
+    bad = proc.extract_tweet_info(
+        {"id_str": "2", "full_text": "b", "created_at": "not a date"}
+    )
+    proc.all_tweets_combined = [
+        {**good, "quote": None},
+        {**bad, "quote": dict(bad)},
+    ]
+
+    records = proc.to_table().to_records()
+
+    assert records[0]["created_at"] == good["created_at"]
+    assert records[1]["created_at"] == "not a date"
+    assert records[1]["quote"]["created_at"] == "not a date"
+
+
+if __name__ == "__main__":
+
+    import pathlib
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_iter_json_array_matches_json_load(pathlib.Path(tmp))
+        test_iter_json_array_is_linear(pathlib.Path(tmp))
+
+    test_created_at_to_epoch_matches_scalar_parser()
+    test_table_round_trip_keeps_unparsed_created_at()
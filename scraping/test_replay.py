@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+import time
+
+import replay
+from replay import replay_requests
+
+
+class FakeResponse:
+
+    def __init__(self, body, status=200):
+
+        self.body = body
+        self.status = status
+        self.headers = {}
+
+    async def json(self):
+
+        return json.loads(self.body)
+
+
+class FakeRequestContext:
+
+    def __init__(self, bodies):
+
+        self.bodies = bodies
+        self.disposed = False
+
+    async def fetch(self, url, method="GET", headers=None):
+
+        await asyncio.sleep(0.01)
+        return FakeResponse(self.bodies[url])
+
+    async def dispose(self):
+
+        self.disposed = True
+
+
+class FakePlaywright:
+
+    def __init__(self, context):
+
+        self.request = self
+        self.context = context
+
+    async def new_context(self, **kwargs):
+
+        return self.context
+
+    async def __aenter__(self):
+
+        return self
+
+    async def __aexit__(self, *exc):
+
+        return False
+
+
+def test_replay_skips_bad_responses_and_callbacks(monkeypatch):
+
+    bodies = {f"u{i}": json.dumps({"page": i}) for i in range(8)}
+    bodies["u3"] = "<html>rate limited</html>"
+    context = FakeRequestContext(bodies)
+    monkeypatch.setattr(replay, "async_playwright", lambda: FakePlaywright(context))
+
+    seen = []
+    loop_thread = []
+
+    def on_response(data):
+        loop_thread.append(threading.current_thread() is threading.main_thread())
+        if data["page"] == 5:
+            raise RuntimeError("consumer failed")
+        # a blocking consumer must not stall the fetches
+        time.sleep(0.05)
+        seen.append(data["page"])
+
+    requests = [(url, "GET", {}) for url in bodies]
+    results = asyncio.run(
+        replay_requests(requests, delay_min=0, delay_max=0, on_response=on_response)
+    )
+
+    assert [data["page"] for data in results] == [0, 1, 2, 4, 5, 6, 7]
+    assert sorted(seen) == [0, 1, 2, 4, 6, 7]
+    assert not any(loop_thread)
+    assert context.disposed
+
+
+if __name__ == "__main__":
+
+    import pytest
+
+    pytest.main([__file__])
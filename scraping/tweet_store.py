@@ -0,0 +1,82 @@
+import json
+import os
+import re
+import time
+
+try:
+    from columnar import TweetTable
+except ImportError:
+    from scraping.columnar import TweetTable
+
+
+class TweetStore:
+    """On-disk history of combined tweets, one Parquet file per handle.
+
+    Next to each ``<handle>.parquet`` sits ``<handle>.json`` with the newest
+    tweet id and timestamp, so a refresh can tell where the known history
+    starts without reading the table.
+    """
+
+    def __init__(self, root="tweet_store"):
+
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, handle, ext):
+
+        safe = re.sub(r"[^A-Za-z0-9_]", "_", handle.lower())
+        return os.path.join(self.root, f"{safe}.{ext}")
+
+    def meta(self, handle):
+
+        try:
+            with open(self._path(handle, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def newest_id(self, handle):
+
+        meta = self.meta(handle)
+        return int(meta["newest_id"]) if meta and meta.get("newest_id") else None
+
+    def load(self, handle):
+
+        if not os.path.exists(self._path(handle, "parquet")):
+            return []
+
+        return TweetTable.read_parquet(self._path(handle, "parquet")).to_records()
+
+    def merge(self, handle, combined_tweets):
+        """Add new combined tweets to the handle's history, returns how many were new."""
+
+        history = self.load(handle)
+        known = {tweet["id"] for tweet in history if tweet["id"]}
+
+        delta = [
+            tweet
+            for tweet in combined_tweets
+            if tweet["id"] and tweet["id"] not in known
+        ]
+
+        if not delta and history:
+            return 0
+
+        merged = history + delta
+        merged.sort(key=lambda x: x["created_at_timestamp"], reverse=True)
+
+        TweetTable.from_records(merged).write_parquet(self._path(handle, "parquet"))
+
+        newest = max(merged, key=lambda x: int(x["id"]) if x["id"] else 0, default=None)
+        meta = {
+            "handle": handle,
+            "newest_id": newest["id"] if newest else None,
+            "newest_timestamp": newest["created_at_timestamp"] if newest else None,
+            "count": len(merged),
+            "updated_at": time.time(),
+        }
+
+        with open(self._path(handle, "json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        return len(delta)
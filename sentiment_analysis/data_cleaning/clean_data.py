@@ -1,11 +1,18 @@
 import os
 import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import nltk
 from pathlib import Path
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusWriter
+
 
 def ensure_nltk():
 
@@ -41,9 +48,26 @@ def ensure_text(x):
     return x if isinstance(x, str) else ("" if x is None else str(x))
 
 
+HANDLE_RE = re.compile(r"@\w+")
+URL_RE = re.compile(r"https?://\S+|www\.\S+")
+PUNCT_RE = re.compile(r"[^\w\s]")
+
+# word_tokenize still splits these after punctuation is gone
+# (NLTK's Treebank contractions that do not need an apostrophe)
+SPLIT_WORDS = {
+    "cannot": " can not ",
+    "gimme": " gim me ",
+    "gonna": " gon na ",
+    "gotta": " got ta ",
+    "lemme": " lem me ",
+    "wanna": " wan na ",
+}
+SPLIT_WORDS_RE = re.compile(r"\b(?:cannot|gimme|gonna|gotta|lemme)\b|\bwanna(?=\s|$)")
+
+
 def remove_handles(text: str) -> str:
     text = ensure_text(text)
-    return re.sub(r"@\w+", " ", text)
+    return HANDLE_RE.sub(" ", text)
 
 
 def preprocess_text(text: str):
@@ -64,22 +88,112 @@ def preprocess_text(text: str):
     return filtered_tokens
 
 
+def _split_words(match) -> str:
+    return SPLIT_WORDS[match.group()]
+
+
+def fast_preprocess_text(text: str):
+    "Regex-only ``preprocess_text``, same tokens without NLTK tokenization"
+
+    text = URL_RE.sub(" ", text)
+    text = PUNCT_RE.sub("", text).lower()
+
+    # every split word has a doubled letter, which skips most tweets cheaply
+    if "nn" in text or "mm" in text or "tt" in text:
+        text = SPLIT_WORDS_RE.sub(_split_words, text)
+
+    return [
+        token for token in text.split() if len(token) > 3 and token not in stop_words
+    ]
+
+
 root_dir = Path(__file__).parent.parent
 
 DATA_PATH = root_dir / "data/data.csv"
+CORPUS_DIR = root_dir / "data/corpus"
 names = ["sentiment", "tweet_id", "date", "flag", "user", "tweet_text"]
 
-df = pd.read_csv(
-    DATA_PATH,
-    encoding="ISO-8859-1",
-    names=names,
-    dtype={"sentiment": str, "tweet_id": str},
-)
 
-df.drop(columns=["tweet_id", "date", "flag", "user"], inplace=True, errors="ignore")
+def clean_for_model(text: str, text_format: str = "repr") -> str:
+    # same string the LR model was trained on: the repr of the token list
+    # (cleaned_data.csv) or the space-joined tokens (pre-tokenized corpus)
+    tokens = fast_preprocess_text(remove_handles(text))
+    return " ".join(tokens) if text_format == "joined" else str(tokens)
+
+
+def clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+
+    df = df.drop(columns=["tweet_id", "date", "flag", "user"], errors="ignore")
+
+    df["tweet_text"] = [remove_handles(text) for text in df["tweet_text"]]
+
+    df["cleaned_tweet"] = [fast_preprocess_text(text) for text in df["tweet_text"]]
+
+    return df
+
+
+def clean_csv(
+    in_path=DATA_PATH,
+    out_path="cleaned_data.csv",
+    chunk_size: int = 100_000,
+    workers: int = None,
+    corpus_dir=None,
+) -> int:
+    """Clean ``in_path`` chunk by chunk across a process pool.
+
+    Chunks are written in input order as soon as they are done, with at most
+    two per worker in flight, so memory stays bounded by the chunk size.
+    With ``corpus_dir`` the token lists are also written as a pre-tokenized
+    corpus (see ``corpus.CorpusWriter``) that training can read directly.
+    """
+
+    reader = pd.read_csv(
+        in_path,
+        encoding="ISO-8859-1",
+        names=names,
+        dtype={"sentiment": str, "tweet_id": str},
+        chunksize=chunk_size,
+    )
+
+    workers = workers or os.cpu_count() or 1
+    rows = 0
+    corpus = CorpusWriter(corpus_dir) if corpus_dir is not None else None
+
+    with ProcessPoolExecutor(workers) as executor:
+
+        pending = deque()
+
+        def write_next():
+            nonlocal rows
+            cleaned = pending.popleft().result()
+            cleaned.to_csv(
+                out_path, mode="a" if rows else "w", header=not rows, index=False
+            )
+            if corpus is not None:
+                corpus.add(cleaned["cleaned_tweet"], cleaned["sentiment"].astype(int))
+            rows += len(cleaned)
+
+        for chunk in reader:
+            pending.append(executor.submit(clean_chunk, chunk))
+            if len(pending) >= workers * 2:
+                write_next()
+
+        while pending:
+            write_next()
+
+    if corpus is not None:
+        corpus.close()
+
+    return rows
+
+
+def main():
+
+    rows = clean_csv(corpus_dir=CORPUS_DIR)
+
+    print(f"Cleaned {rows} tweets")
 
-df["tweet_text"] = df["tweet_text"].apply(remove_handles)
 
-df["cleaned_tweet"] = df["tweet_text"].apply(preprocess_text)
+if __name__ == "__main__":
 
-df.to_csv("cleaned_data.csv", index=False)
+    main()
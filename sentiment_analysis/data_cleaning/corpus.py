@@ -0,0 +1,160 @@
+import json
+import os
+
+import numpy as np
+
+CORPUS_FORMAT = 1
+
+
+class CorpusWriter:
+    """Writes cleaned token lists as a pre-tokenized corpus, chunk by chunk.
+
+    The output directory holds ``vocab.json`` (terms in id order),
+    ``tokens.npy`` (int32 token ids of every document, back to back),
+    ``offsets.npy`` (int64, document ``i`` is ``tokens[offsets[i]:offsets[i + 1]]``),
+    ``labels.npy`` and ``meta.json``. Token ids are streamed to disk as they
+    come in, so only the vocabulary and per-document lengths stay in memory.
+    """
+
+    def __init__(self, out_dir):
+
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.out_dir = out_dir
+        self.vocab = {}
+        self.n_tokens = 0
+        self.lengths = []
+        self.labels = []
+        self.tmp_path = os.path.join(out_dir, "tokens.bin.tmp")
+        self.tmp_file = open(self.tmp_path, "wb")
+
+    def add(self, token_lists, labels):
+
+        vocab = self.vocab
+
+        ids = np.fromiter(
+            (
+                vocab.setdefault(token, len(vocab))
+                for tokens in token_lists
+                for token in tokens
+            ),
+            dtype=np.int32,
+        )
+        ids.tofile(self.tmp_file)
+
+        self.n_tokens += len(ids)
+        self.lengths.append(
+            np.array([len(tokens) for tokens in token_lists], dtype=np.int64)
+        )
+        self.labels.append(np.asarray(labels, dtype=np.int16))
+
+    def close(self):
+
+        self.tmp_file.close()
+
+        lengths = (
+            np.concatenate(self.lengths) if self.lengths else np.zeros(0, np.int64)
+        )
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # copy the raw ids into a proper .npy through memory maps
+        tokens = np.lib.format.open_memmap(
+            os.path.join(self.out_dir, "tokens.npy"),
+            mode="w+",
+            dtype=np.int32,
+            shape=(self.n_tokens,),
+        )
+        if self.n_tokens:
+            tokens[:] = np.memmap(self.tmp_path, dtype=np.int32, mode="r")
+        tokens.flush()
+        del tokens
+        os.remove(self.tmp_path)
+
+        np.save(os.path.join(self.out_dir, "offsets.npy"), offsets)
+        np.save(
+            os.path.join(self.out_dir, "labels.npy"),
+            np.concatenate(self.labels) if self.labels else np.zeros(0, np.int16),
+        )
+
+        with open(os.path.join(self.out_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(list(self.vocab), f, ensure_ascii=False)
+
+        with open(os.path.join(self.out_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "format": CORPUS_FORMAT,
+                    "documents": len(lengths),
+                    "tokens": self.n_tokens,
+                    "vocab_size": len(self.vocab),
+                },
+                f,
+                indent=2,
+            )
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.close()
+
+
+class Corpus:
+    "A pre-tokenized corpus written by ``CorpusWriter``"
+
+    def __init__(self, vocab, tokens, offsets, labels):
+
+        self.vocab = vocab
+        self.tokens = tokens
+        self.offsets = offsets
+        self.labels = labels
+
+    @classmethod
+    def load(cls, path, mmap=True):
+
+        mmap_mode = "r" if mmap else None
+
+        with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+
+        return cls(
+            vocab,
+            np.load(os.path.join(path, "tokens.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "offsets.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "labels.npy"), mmap_mode=mmap_mode),
+        )
+
+    @staticmethod
+    def exists(path):
+
+        return os.path.exists(os.path.join(path, "meta.json"))
+
+    def __len__(self):
+
+        return len(self.offsets) - 1
+
+    def doc_ids(self, i):
+
+        return self.tokens[self.offsets[i] : self.offsets[i + 1]]
+
+    def doc_tokens(self, i):
+
+        return [self.vocab[j] for j in self.doc_ids(i)]
+
+    def to_arrow(self):
+
+        import pyarrow as pa
+
+        # the offsets and ids become a list column without copying the ids
+        docs = pa.LargeListArray.from_arrays(
+            pa.array(np.asarray(self.offsets)), pa.array(np.asarray(self.tokens))
+        )
+        return pa.table({"label": pa.array(np.asarray(self.labels)), "token_ids": docs})
+
+    def write_parquet(self, path):
+
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path, compression="zstd")
@@ -0,0 +1,291 @@
+import csv
+import glob
+import itertools
+import json
+import os
+from collections import deque
+from multiprocessing import get_context
+
+from .cache import score_from_probs
+
+SENTIMENT140_NAMES = ["sentiment", "tweet_id", "date", "flag", "user", "tweet_text"]
+TEXT_COLUMNS = ("text", "tweet_text", "full_text")
+ID_COLUMNS = ("id", "tweet_id", "id_str")
+
+_model = None
+
+
+def iter_json_records(path):
+    # tweet lists saved by the scraper, or a raw ``_raw_tweets.json`` capture
+
+    from scraping.process import Process, iter_json_array
+
+    items = iter_json_array(path)
+    first = next(items, None)
+    if first is None:
+        return
+
+    items = itertools.chain([first], items)
+
+    if "data" in first:
+        for tweet in Process().stream_tweets(items):
+            yield tweet["id"], tweet["text"]
+        return
+
+    for tweet in items:
+        tweet = tweet.get("main_tweet", tweet)
+        yield tweet.get("id", ""), tweet.get("text", "")
+
+
+def iter_csv_records(path, chunk_size=50_000):
+    # Sentiment140 layout unless the file has a header naming a text column
+
+    import pandas as pd
+
+    with open(path, "r", encoding="ISO-8859-1", newline="") as f:
+        header = [col.strip().lower() for col in next(csv.reader(f), [])]
+
+    has_header = any(col in TEXT_COLUMNS for col in header)
+
+    reader = pd.read_csv(
+        path,
+        encoding="ISO-8859-1",
+        names=None if has_header else SENTIMENT140_NAMES,
+        dtype=str,
+        chunksize=chunk_size,
+    )
+
+    for df in reader:
+        columns = {col.strip().lower(): col for col in df.columns}
+        text_col = next(columns[c] for c in TEXT_COLUMNS if c in columns)
+        id_col = next((columns[c] for c in ID_COLUMNS if c in columns), None)
+        ids = df[id_col].fillna("") if id_col else [""] * len(df)
+        yield from zip(ids, df[text_col].fillna(""))
+
+
+def iter_records(paths):
+
+    for path in paths:
+        if path.lower().endswith(".csv"):
+            yield from iter_csv_records(path)
+        else:
+            yield from iter_json_records(path)
+
+
+def iter_chunks(records, chunk_size, offset=0):
+    """``(start_offset, [(id, text), ...])`` chunks, skipping ``offset`` records."""
+
+    records = itertools.islice(records, offset, None)
+    start = offset
+
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _init_worker(num_threads, backend, onnx_dir):
+
+    global _model
+
+    # one model per process, each limited to its share of the cores, the
+    # onnx backend sets its own thread count and never needs torch
+    if backend == "torch":
+        import torch
+
+        torch.set_num_threads(num_threads)
+
+    from .inference import infer_sentiment
+
+    _model = infer_sentiment(
+        backend=backend, onnx_dir=onnx_dir, num_threads=num_threads
+    )
+
+
+def _score_chunk(start, chunk):
+
+    probs = _model.batch_probs([text for _, text in chunk])
+
+    return [
+        {
+            "offset": start + i,
+            "id": str(tweet_id),
+            "score": score_from_probs(p),
+            "negative": p[0],
+            "neutral": p[1],
+            "positive": p[2],
+        }
+        for i, ((tweet_id, _), p) in enumerate(zip(chunk, probs))
+    ]
+
+
+class JsonlWriter:
+
+    def __init__(self, path):
+
+        self.path = path
+
+    def truncate(self, size):
+
+        if os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+        elif size:
+            raise ValueError(f"{self.path} is missing, cannot resume")
+
+    def write(self, start, rows):
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        return os.path.getsize(self.path)
+
+
+class ParquetWriter:
+    # one part file per chunk, named by its first offset
+
+    def __init__(self, path):
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def truncate(self, offset):
+
+        for part in glob.glob(os.path.join(self.path, "part-*.parquet")):
+            if int(os.path.basename(part)[5:-8]) >= offset:
+                os.remove(part)
+
+    def write(self, start, rows):
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        part = os.path.join(self.path, f"part-{start:012d}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows), f"{part}.tmp", compression="zstd")
+        os.replace(f"{part}.tmp", part)
+
+        return None
+
+
+def _load_progress(path):
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_progress(path, progress):
+
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(progress, f)
+
+    os.replace(f"{path}.tmp", path)
+
+
+def score_files(
+    paths,
+    output,
+    file_format="jsonl",
+    workers=None,
+    chunk_size=2048,
+    backend="torch",
+    onnx_dir=None,
+    resume=False,
+    offset=None,
+):
+    """Score every tweet in ``paths`` into ``output`` using a process pool.
+
+    Chunks are written in input order. A progress file next to ``output``
+    records how many input records are safely on disk, so ``resume`` can
+    continue after a crash without duplicating or losing rows. ``offset``
+    starts from an explicit record index instead, appending to ``output``.
+    """
+
+    workers = workers or max(1, (os.cpu_count() or 1) // 2)
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    writer = JsonlWriter(output) if file_format == "jsonl" else ParquetWriter(output)
+    progress_path = f"{output.rstrip(os.sep)}.progress.json"
+    progress = _load_progress(progress_path) if resume and offset is None else None
+
+    if offset is None:
+        offset = progress["offset"] if progress else 0
+
+    # drop anything written after the last recorded checkpoint
+    if file_format == "parquet":
+        writer.truncate(offset)
+    elif progress:
+        writer.truncate(progress["bytes"])
+    elif offset == 0:
+        writer.truncate(0)
+
+    chunks = iter_chunks(iter_records(paths), chunk_size, offset)
+    written = offset
+
+    with get_context("spawn").Pool(
+        workers, initializer=_init_worker, initargs=(num_threads, backend, onnx_dir)
+    ) as pool:
+
+        # a small window of chunks in flight keeps memory bounded
+        in_flight = deque()
+
+        def drain_one():
+            nonlocal written
+            start, result = in_flight.popleft()
+            rows = result.get()
+            size = writer.write(start, rows)
+            written = start + len(rows)
+            _save_progress(progress_path, {"offset": written, "bytes": size})
+            print(f"Scored {written} records")
+
+        for start, chunk in chunks:
+            in_flight.append((start, pool.apply_async(_score_chunk, (start, chunk))))
+            if len(in_flight) >= workers * 2:
+                drain_one()
+
+        while in_flight:
+            drain_one()
+
+    return written
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        description="Score tweet archives (JSON or Sentiment140 CSV) offline"
+    )
+    arg_parser.add_argument("inputs", nargs="+")
+    arg_parser.add_argument("--output", required=True)
+    arg_parser.add_argument("--format", default="jsonl", choices=["jsonl", "parquet"])
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--chunk-size", type=int, default=2048)
+    arg_parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    arg_parser.add_argument("--onnx-dir", default=None)
+    arg_parser.add_argument("--resume", action="store_true")
+    arg_parser.add_argument("--offset", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    if os.path.exists(args.output) and not (args.resume or args.offset is not None):
+        arg_parser.error(f"{args.output} exists, pass --resume to continue it")
+
+    total = score_files(
+        args.inputs,
+        args.output,
+        file_format=args.format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        backend=args.backend,
+        onnx_dir=args.onnx_dir,
+        resume=args.resume,
+        offset=args.offset,
+    )
+    print(f"Done: {total} records in {args.output}")
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def plan_batches(lengths, max_tokens=8192, max_batch=128):
+    """Group indices into batches of similar token length.
+
+    Inputs are sorted by length and a batch is closed once padding it to its
+    longest member would exceed ``max_tokens`` (or it holds ``max_batch``
+    items), so one long tweet no longer pads a whole batch of short ones.
+    """
+
+    order = np.argsort(np.asarray(lengths), kind="stable")
+    batches = []
+    current = []
+    longest = 0
+
+    for i in order:
+        length = int(lengths[i])
+        grown = max(longest, length)
+
+        if current and (
+            grown * (len(current) + 1) > max_tokens or len(current) >= max_batch
+        ):
+            batches.append(current)
+            current = []
+            grown = length
+
+        current.append(int(i))
+        longest = grown
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def pad_batch(input_ids, pad_token_id):
+
+    width = max(len(ids) for ids in input_ids)
+    ids = np.full((len(input_ids), width), pad_token_id, dtype=np.int64)
+    mask = np.zeros((len(input_ids), width), dtype=np.int64)
+
+    for row, seq in enumerate(input_ids):
+        ids[row, : len(seq)] = seq
+        mask[row, : len(seq)] = 1
+
+    return ids, mask
+
+
+def bucketed_probs(tokenizer, run, texts, max_tokens=8192, max_batch=128):
+    """Tokenize once, run length-bucketed batches, return rows in input order.
+
+    ``run(input_ids, attention_mask)`` takes padded int64 arrays and returns
+    an ``(batch, n_labels)`` probability array.
+    """
+
+    if not texts:
+        return np.zeros((0, 0))
+
+    input_ids = tokenizer(list(texts), truncation=True)["input_ids"]
+    lengths = [len(ids) for ids in input_ids]
+
+    out = None
+    for batch in plan_batches(lengths, max_tokens, max_batch):
+        ids, mask = pad_batch([input_ids[i] for i in batch], tokenizer.pad_token_id)
+        probs = np.asarray(run(ids, mask))
+
+        if out is None:
+            out = np.zeros((len(texts), probs.shape[1]), dtype=np.float64)
+        out[batch] = probs
+
+    return out
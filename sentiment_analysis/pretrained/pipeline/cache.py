@@ -0,0 +1,141 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+LABELS = ("negative", "neutral", "positive")
+NEUTRAL_BAND = 0.1
+
+
+def score_from_probs(probs, neg_alpha=0.85, pos_beta=1.2):
+
+    negative, neutral, positive = probs
+    e = -1.0 * negative + 0.0 * neutral + 1.0 * positive
+    if e < 0:
+        e = -(abs(e) ** neg_alpha)
+    else:
+        e = e**pos_beta
+    return max(-1.0, min(1.0, e))
+
+
+def top_label(probs):
+    # shaped like one transformers pipeline prediction
+
+    best = max(range(len(LABELS)), key=lambda i: probs[i])
+    return {"label": LABELS[best], "score": probs[best]}
+
+
+def score_category(score, neutral_band=NEUTRAL_BAND):
+    # the buckets the app reports, anything within the band is neutral
+
+    if score > neutral_band:
+        return "Positive"
+    if score < -neutral_band:
+        return "Negative"
+    return "Neutral"
+
+
+def normalize_text(text):
+
+    return " ".join(str(text).split())
+
+
+def cache_key(model_id, text):
+
+    return hashlib.sha1(
+        f"{model_id}\0{normalize_text(text)}".encode("utf-8")
+    ).hexdigest()
+
+
+class ScoreCache:
+    """Label probabilities keyed by a hash of (model id, normalized text).
+
+    An in-memory LRU sits in front of an optional SQLite file, so repeated
+    analyses, overlapping handles and widely quoted tweets are scored once.
+    Probabilities are cached rather than final scores so changing
+    ``neg_alpha``/``pos_beta`` does not invalidate anything.
+    """
+
+    def __init__(self, max_size=100_000, path=None):
+
+        self.max_size = max_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+
+        if path is not None:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS scores "
+                "(key TEXT PRIMARY KEY, negative REAL, neutral REAL, positive REAL)"
+            )
+            self.db.commit()
+
+    def _remember(self, key, probs):
+
+        self.memory[key] = probs
+        self.memory.move_to_end(key)
+
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys):
+
+        found = {}
+
+        with self.lock:
+            missing = []
+            for key in keys:
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[key] = self.memory[key]
+                else:
+                    missing.append(key)
+
+            if self.db is not None and missing:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start : start + 500]
+                    rows = self.db.execute(
+                        "SELECT key, negative, neutral, positive FROM scores "
+                        f"WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, *probs in rows:
+                        found[key] = tuple(probs)
+                        self._remember(key, tuple(probs))
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, items):
+
+        with self.lock:
+            for key, probs in items.items():
+                self._remember(key, tuple(probs))
+
+            if self.db is not None and items:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+                    [(key, *probs) for key, probs in items.items()],
+                )
+                self.db.commit()
+
+    def stats(self):
+
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+    def close(self):
+
+        if self.db is not None:
+            self.db.close()
+            self.db = None
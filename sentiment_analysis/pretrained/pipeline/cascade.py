@@ -0,0 +1,272 @@
+import copy
+import json
+import os
+
+import numpy as np
+
+from .cache import score_category, score_from_probs, top_label
+
+DEFAULT_BAND = (0.2, 0.8)
+CASCADE_FILE = "cascade.json"
+
+
+class CascadeScorer:
+    """TF-IDF logistic regression in front of a transformer model.
+
+    Every text goes through the LR model saved by ``training/train.py``.
+    Texts whose positive-class probability lies inside the uncertainty band
+    ``(low, high)`` are passed on to ``model``, which is an
+    ``infer_sentiment`` or ``InferenceClient``. The rest are scored from the
+    LR probability alone. The band comes from ``cascade.json`` in
+    ``reports_dir`` when ``calibrate`` has written one.
+
+    Exposes the same ``batch``/``single``/``batch_scores`` methods as the
+    models it wraps. ``stats`` counts every text this object has scored, so
+    use ``session`` for numbers that cover a single run.
+    """
+
+    def __init__(self, model, reports_dir="model_reports", band=None):
+
+        from joblib import load
+
+        self.model = model
+        self.vectorizer = load(os.path.join(reports_dir, "vectorizer.joblib"))
+        self.lr = load(os.path.join(reports_dir, "model.joblib"))
+
+        with open(
+            os.path.join(reports_dir, "label_map.json"), "r", encoding="utf-8"
+        ) as f:
+            label_map = json.load(f)
+
+        # classes_ may hold ints or strings depending on how the CSV was read
+        classes = [str(c) for c in self.lr.classes_]
+        self.positive_column = classes.index(str(label_map["positive"]))
+
+        self.text_format = load_text_format(reports_dir)
+
+        if band is None:
+            band = load_band(reports_dir)
+        self.low, self.high = band
+
+        self.texts_seen = 0
+        self.texts_skipped = 0
+
+    def lr_positive_proba(self, texts):
+
+        from sentiment_analysis.data_cleaning.clean_data import clean_for_model
+
+        features = self.vectorizer.transform(
+            [clean_for_model(t, self.text_format) for t in texts]
+        )
+        return self.lr.predict_proba(features)[:, self.positive_column]
+
+    def batch_probs(self, texts):
+
+        texts = list(texts)
+        if not texts:
+            return []
+
+        p = self.lr_positive_proba(texts)
+        uncertain = np.flatnonzero((p > self.low) & (p < self.high))
+
+        probs = [lr_probs(x) for x in p]
+
+        if len(uncertain):
+            for i, row in zip(
+                uncertain, self.model.batch_probs([texts[i] for i in uncertain])
+            ):
+                probs[i] = tuple(row)
+
+        self.texts_seen += len(texts)
+        self.texts_skipped += len(texts) - len(uncertain)
+
+        return probs
+
+    def batch(self, texts):
+
+        return [[top_label(probs)] for probs in self.batch_probs(texts)]
+
+    def single(self, text):
+
+        return self.batch([text])
+
+    def batch_scores(self, texts, neg_alpha=0.85, pos_beta=1.2):
+
+        return [
+            score_from_probs(probs, neg_alpha, pos_beta)
+            for probs in self.batch_probs(texts)
+        ]
+
+    def session(self):
+        "Same models and band, with counters of its own"
+
+        run = copy.copy(self)
+        run.texts_seen = 0
+        run.texts_skipped = 0
+        return run
+
+    def stats(self):
+
+        return {
+            "texts": self.texts_seen,
+            "skipped_transformer": self.texts_skipped,
+            "skip_fraction": (
+                self.texts_skipped / self.texts_seen if self.texts_seen else 0.0
+            ),
+            "band": [self.low, self.high],
+        }
+
+
+def lr_probs(p):
+    # LR only knows negative/positive, so its neutral mass is zero
+
+    return (1.0 - float(p), 0.0, float(p))
+
+
+def load_text_format(reports_dir="model_reports"):
+    # models trained from the pre-tokenized corpus expect joined tokens
+
+    import yaml
+
+    try:
+        with open(os.path.join(reports_dir, "config.yaml"), "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return "repr"
+
+    return config.get("TEXT_FORMAT", "repr")
+
+
+def load_band(reports_dir="model_reports"):
+
+    try:
+        with open(os.path.join(reports_dir, CASCADE_FILE), "r", encoding="utf-8") as f:
+            calibration = json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_BAND
+
+    return calibration["low"], calibration["high"]
+
+
+def choose_band(lr_proba, lr_disagrees, target_agreement=0.95, steps=101):
+    """Narrowest band whose cascade output matches the transformer often enough.
+
+    ``lr_proba`` is the LR positive probability per text and ``lr_disagrees``
+    whether the LR answer alone would land in a different category than the
+    transformer's. Texts inside the band take the transformer's answer, so
+    only the LR calls outside it can disagree. Among ``(low, high)`` grid
+    pairs with at most ``1 - target_agreement`` disagreements, the one that
+    sends the fewest texts to the transformer wins.
+    """
+
+    p = np.asarray(lr_proba, dtype=np.float64)
+    wrong = np.asarray(lr_disagrees, dtype=bool)
+    n = len(p)
+
+    if n == 0:
+        raise ValueError("need at least one calibration text")
+
+    order = np.argsort(p, kind="stable")
+    p_sorted = p[order]
+    wrong_cum = np.concatenate([[0], np.cumsum(wrong[order])])
+
+    lows = np.linspace(0.0, 0.5, steps)
+    highs = np.linspace(0.5, 1.0, steps)
+
+    # confident negatives are p <= low, confident positives are p >= high
+    neg_end = np.searchsorted(p_sorted, lows, side="right")
+    pos_start = np.searchsorted(p_sorted, highs, side="left")
+
+    errors = wrong_cum[neg_end][:, None] + (
+        wrong_cum[-1] - wrong_cum[pos_start][None, :]
+    )
+    sent = pos_start[None, :] - neg_end[:, None]
+
+    allowed = int(np.floor((1 - target_agreement) * n + 1e-9))
+    sent = np.where(errors <= allowed, sent, n + 1)
+
+    i, j = np.unravel_index(np.argmin(sent), sent.shape)
+
+    return {
+        "low": float(lows[i]),
+        "high": float(highs[j]),
+        "target_agreement": float(target_agreement),
+        "agreement": 1 - float(errors[i, j]) / n,
+        "skip_fraction": 1 - float(sent[i, j]) / n,
+        "samples": n,
+    }
+
+
+def sample_texts(records, k, seed=67):
+    # reservoir sample, Sentiment140 is sorted by label so a prefix is useless
+
+    rng = np.random.default_rng(seed)
+    sample = []
+
+    for n, (_, text) in enumerate(records):
+        if n < k:
+            sample.append(text)
+        else:
+            j = rng.integers(0, n + 1)
+            if j < k:
+                sample[j] = text
+
+    return sample
+
+
+def calibrate(
+    model,
+    texts,
+    reports_dir="model_reports",
+    target_agreement=0.95,
+):
+    """Pick the band on ``texts`` and save it to ``reports_dir/cascade.json``."""
+
+    texts = list(texts)
+    cascade = CascadeScorer(model, reports_dir, band=DEFAULT_BAND)
+
+    lr_proba = cascade.lr_positive_proba(texts)
+
+    # agreement on the app's Negative/Neutral/Positive buckets, not just on
+    # polarity, since an LR answer can never come out Neutral
+    lr_categories = [score_category(score_from_probs(lr_probs(p))) for p in lr_proba]
+    transformer_categories = [
+        score_category(score_from_probs(probs)) for probs in model.batch_probs(texts)
+    ]
+    lr_disagrees = [a != b for a, b in zip(lr_categories, transformer_categories)]
+
+    report = choose_band(lr_proba, lr_disagrees, target_agreement)
+
+    with open(os.path.join(reports_dir, CASCADE_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    return report
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    from .batch_score import iter_records
+    from .inference import infer_sentiment
+
+    arg_parser = argparse.ArgumentParser(
+        description="Calibrate the LR -> transformer cascade band"
+    )
+    arg_parser.add_argument("inputs", nargs="+")
+    arg_parser.add_argument("--reports-dir", default="model_reports")
+    arg_parser.add_argument("--target-agreement", type=float, default=0.95)
+    arg_parser.add_argument("--samples", type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    texts = sample_texts(iter_records(args.inputs), args.samples)
+
+    report = calibrate(
+        infer_sentiment(), texts, args.reports_dir, args.target_agreement
+    )
+    print(json.dumps(report, indent=2))
+    print(
+        f"Band ({report['low']:.2f}, {report['high']:.2f}) skips the transformer "
+        f"for {report['skip_fraction']:.1%} of texts at "
+        f"{report['agreement']:.1%} agreement"
+    )
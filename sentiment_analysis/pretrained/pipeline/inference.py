@@ -1,12 +1,42 @@
-import torch
-from transformers import pipeline
+from .batching import bucketed_probs
+from .cache import LABELS, ScoreCache, cache_key, score_from_probs, top_label
+
+MODEL_ID = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 
 
 class infer_sentiment:
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache=None,
+        backend="torch",
+        onnx_dir=None,
+        quantized=True,
+        max_tokens=8192,
+        num_threads=None,
+        model_id=MODEL_ID,
+    ):
+
+        self.model_id = model_id
+        self.cache = cache
+        self.backend = backend
+        self.pipe = None
+        self.onnx = None
+        self.max_tokens = max_tokens
+
+        if backend == "onnx":
+            from .onnx_backend import OnnxSentimentModel
+
+            # the cache key must not mix scores from different backends
+            self.model_id = f"{self.model_id}:onnx{'-int8' if quantized else ''}"
+            self.onnx = OnnxSentimentModel(
+                onnx_dir, quantized=quantized, num_threads=num_threads
+            )
+            return
 
-        self.model_id = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+        # torch and transformers are only needed by the torch backend
+        import torch
+        from transformers import pipeline
 
         self.pipe = pipeline(
             task="text-classification",
@@ -15,31 +45,81 @@ class infer_sentiment:
             torch_dtype=torch.float16 if torch.cuda.is_available() else None,
         )
 
+        id2label = self.pipe.model.config.id2label
+        label2id = {label.lower(): i for i, label in id2label.items()}
+        self.label_order = [label2id[label] for label in LABELS]
+
+    def top_labels(self, texts):
+
+        return [[top_label(probs)] for probs in self.predict_probs(texts)]
+
     def batch(self, texts):
 
+        if self.onnx is not None:
+            return self.top_labels(texts)
+
         return self.pipe(texts, batch_size=128, truncation=True, top_k=1)
 
     def single(self, text):
 
+        if self.onnx is not None:
+            return self.top_labels([text])
+
         return self.pipe([text], truncation=True, top_k=1)
-    
-    def batch_scores(self, texts, neg_alpha=0.85, pos_beta=1.2):
-        outs = self.pipe(
-            texts,
-            batch_size=128,
-            truncation=True,
-            top_k=None,
-            return_all_scores=True
+
+    def run_model(self, input_ids, attention_mask):
+
+        import torch
+
+        model = self.pipe.model
+
+        with torch.inference_mode():
+            logits = model(
+                input_ids=torch.as_tensor(input_ids, device=model.device),
+                attention_mask=torch.as_tensor(attention_mask, device=model.device),
+            ).logits
+
+        probs = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+        return probs[:, self.label_order]
+
+    def predict_probs(self, texts):
+        # (negative, neutral, positive) per text, straight from the model
+        texts = list(texts)
+
+        if self.onnx is not None:
+            return self.onnx.predict_probs(texts, max_tokens=self.max_tokens)
+
+        probs = bucketed_probs(
+            self.pipe.tokenizer, self.run_model, texts, max_tokens=self.max_tokens
         )
-        scores = []
-        for dist in outs:
-            probs = {d["label"].lower(): d["score"] for d in dist}
-            e = (-1.0 * probs.get("negative", 0.0)
-                 + 0.0 * probs.get("neutral", 0.0)
-                 + 1.0 * probs.get("positive", 0.0))
-            if e < 0:
-                e = - (abs(e) ** neg_alpha)
-            else:
-                e = e ** pos_beta
-            scores.append(max(-1.0, min(1.0, e)))
-        return scores
+        return [tuple(float(p) for p in row) for row in probs]
+
+    def batch_probs(self, texts):
+
+        texts = list(texts)
+
+        if self.cache is None:
+            return self.predict_probs(texts)
+
+        keys = [cache_key(self.model_id, text) for text in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        # normalization only shapes the key, the model sees the text as given
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in misses:
+                misses[key] = text
+
+        if misses:
+            computed = dict(zip(misses, self.predict_probs(list(misses.values()))))
+            self.cache.put_many(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def batch_scores(self, texts, neg_alpha=0.85, pos_beta=1.2):
+
+        return [
+            score_from_probs(probs, neg_alpha, pos_beta)
+            for probs in self.batch_probs(texts)
+        ]
@@ -0,0 +1,181 @@
+import json
+import os
+
+import numpy as np
+
+from .batching import bucketed_probs
+from .cache import LABELS
+
+DEFAULT_MODEL_ID = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+DRIFT_TEXTS = [
+    "I love programming!",
+    "meh",
+    "this is terrible",
+    "Just landed in Tokyo, can't wait to explore",
+    "Worst customer service I have ever dealt with. Never again.",
+    "The meeting has been moved to 3pm tomorrow.",
+    "not bad at all, honestly better than I expected",
+    "I can't believe they cancelled the show, so disappointed",
+    "Happy birthday to my best friend!!! 🎉",
+    "Traffic is awful today",
+    "new blog post is up, link in bio",
+    "ugh, my code broke again and I don't know why",
+]
+
+
+def _import_onnxruntime():
+
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(
+            "The ONNX backend needs onnxruntime: pip install onnxruntime"
+        ) from e
+
+    return onnxruntime
+
+
+def export_onnx(out_dir, model_id=DEFAULT_MODEL_ID, quantize=True, opset=17):
+    """Export the Hugging Face model to ``out_dir/model.onnx`` (+ ``model.int8.onnx``)."""
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+
+    dummy = tokenizer(["export me"], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model.onnx")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+
+    tokenizer.save_pretrained(out_dir)
+
+    with open(os.path.join(out_dir, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {str(k): v.lower() for k, v in model.config.id2label.items()}, f, indent=2
+        )
+
+    if quantize:
+        _import_onnxruntime()
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            fp32_path,
+            os.path.join(out_dir, "model.int8.onnx"),
+            weight_type=QuantType.QInt8,
+        )
+
+    return out_dir
+
+
+class OnnxSentimentModel:
+    """RoBERTa sentiment through ONNX Runtime on CPU, fp32 or dynamic int8."""
+
+    def __init__(self, model_dir, quantized=True, num_threads=None):
+
+        ort = _import_onnxruntime()
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        with open(os.path.join(model_dir, "labels.json"), "r", encoding="utf-8") as f:
+            id2label = {int(k): v for k, v in json.load(f).items()}
+
+        # column order that turns the logits into (negative, neutral, positive)
+        label2id = {v: k for k, v in id2label.items()}
+        self.order = [label2id[label] for label in LABELS]
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        name = "model.int8.onnx" if quantized else "model.onnx"
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, name),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def run(self, input_ids, attention_mask):
+
+        logits = self.session.run(
+            ["logits"],
+            {
+                "input_ids": np.asarray(input_ids, dtype=np.int64),
+                "attention_mask": np.asarray(attention_mask, dtype=np.int64),
+            },
+        )[0]
+
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs[:, self.order]
+
+    def predict_probs(self, texts, max_tokens=8192):
+
+        probs = bucketed_probs(self.tokenizer, self.run, texts, max_tokens=max_tokens)
+        return [tuple(float(p) for p in row) for row in probs]
+
+
+def check_drift(
+    reference, candidate, texts=DRIFT_TEXTS, max_abs_diff=0.1, min_agreement=0.9
+):
+    """Compare two ``infer_sentiment`` backends on a fixed text set.
+
+    Returns a report with the top-label agreement rate, the largest
+    probability difference, and ``drifted`` set when either is out of bounds.
+    """
+
+    ref = np.asarray(reference.batch_probs(texts))
+    cand = np.asarray(candidate.batch_probs(texts))
+
+    agreement = float(np.mean(ref.argmax(axis=1) == cand.argmax(axis=1)))
+    max_diff = float(np.abs(ref - cand).max()) if len(texts) else 0.0
+
+    return {
+        "texts": len(texts),
+        "label_agreement": agreement,
+        "max_abs_prob_diff": max_diff,
+        "drifted": agreement < min_agreement or max_diff > max_abs_diff,
+    }
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    from .inference import infer_sentiment
+
+    arg_parser = argparse.ArgumentParser(
+        description="Export the sentiment model to ONNX and check it for drift"
+    )
+    arg_parser.add_argument("out_dir")
+    arg_parser.add_argument("--no-quantize", action="store_true")
+    args = arg_parser.parse_args()
+
+    export_onnx(args.out_dir, quantize=not args.no_quantize)
+
+    report = check_drift(
+        infer_sentiment(),
+        infer_sentiment(
+            backend="onnx", onnx_dir=args.out_dir, quantized=not args.no_quantize
+        ),
+    )
+    print(json.dumps(report, indent=2))
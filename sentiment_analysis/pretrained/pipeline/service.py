@@ -0,0 +1,186 @@
+import json
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .cache import score_from_probs, top_label
+
+
+class MicroBatcher:
+    """Coalesces concurrent ``submit`` calls into shared model batches.
+
+    The worker waits at most ``max_latency`` seconds after the first queued
+    request for others to join, then runs one ``predict_probs`` call for up to
+    ``max_batch`` texts and hands every caller its own slice of the result.
+    """
+
+    def __init__(self, predict_probs, max_batch=256, max_latency=0.02):
+
+        self.predict_probs = predict_probs
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._loop, daemon=True)
+        self.worker.start()
+
+    def submit(self, texts):
+
+        future = Future()
+        self.requests.put((list(texts), future))
+        return future
+
+    def _loop(self):
+
+        while True:
+            pending = [self.requests.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_latency
+
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for request_texts, _ in pending for text in request_texts]
+
+            try:
+                probs = self.predict_probs(texts) if texts else []
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for request_texts, future in pending:
+                future.set_result(probs[start : start + len(request_texts)])
+                start += len(request_texts)
+
+
+def make_handler(batcher):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, status, payload):
+
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+
+            if self.path != "/probs":
+                self._send(404, {"error": "not found"})
+                return
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                texts = json.loads(self.rfile.read(length))["texts"]
+                probs = batcher.submit(texts).result()
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+                return
+
+            self._send(200, {"probs": [list(p) for p in probs]})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(model, host="127.0.0.1", port=8765, max_batch=256, max_latency=0.02):
+
+    batcher = MicroBatcher(model.batch_probs, max_batch, max_latency)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    print(f"Sentiment service listening on http://{host}:{port}")
+    server.serve_forever()
+
+
+class InferenceClient:
+    """Talks to ``serve`` with the same methods as ``infer_sentiment``."""
+
+    def __init__(self, url="http://127.0.0.1:8765", timeout=300):
+
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def healthy(self):
+
+        try:
+            with urllib.request.urlopen(f"{self.url}/health", timeout=2) as r:
+                return r.status == 200
+        except OSError:
+            return False
+
+    def batch_probs(self, texts):
+
+        texts = list(texts)
+        if not texts:
+            return []
+
+        req = urllib.request.Request(
+            f"{self.url}/probs",
+            data=json.dumps({"texts": texts}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as r:
+            return [tuple(p) for p in json.loads(r.read())["probs"]]
+
+    def batch(self, texts):
+
+        return [[top_label(probs)] for probs in self.batch_probs(texts)]
+
+    def single(self, text):
+
+        return self.batch([text])
+
+    def batch_scores(self, texts, neg_alpha=0.85, pos_beta=1.2):
+
+        return [
+            score_from_probs(probs, neg_alpha, pos_beta)
+            for probs in self.batch_probs(texts)
+        ]
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    from .cache import ScoreCache
+    from .inference import infer_sentiment
+
+    arg_parser = argparse.ArgumentParser(description="Local sentiment model service")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--max-batch", type=int, default=256)
+    arg_parser.add_argument("--max-latency", type=float, default=0.02)
+    arg_parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    arg_parser.add_argument("--onnx-dir", default=None)
+    arg_parser.add_argument("--cache-path", default=None)
+    args = arg_parser.parse_args()
+
+    model = infer_sentiment(
+        cache=ScoreCache(path=args.cache_path),
+        backend=args.backend,
+        onnx_dir=args.onnx_dir,
+    )
+    serve(model, args.host, args.port, args.max_batch, args.max_latency)
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from data_cleaning.clean_data import (
+    DATA_PATH,
+    fast_preprocess_text,
+    names,
+    preprocess_text,
+    remove_handles,
+)
+
+SAMPLE_TWEETS = [
+    "@switchfoot http://twitpic.com/2y1zl - Awww, that's a bummer.  You shoulda got David Carr of Third Day to do it. ;D",
+    "is upset that he can't update his Facebook by texting it... and might cry as a result  School today also. Blah!",
+    "I cannot believe I'm gonna miss it, wanna cry",
+    "gimme a break, lemme sleep, gotta work tomorrow www.example.com",
+    "Cannot. Wait. For. The weekend!!! #friday",
+    "café naïve İstanbul ßstraße “quoted” «text»",
+    "numbers 2009 and under_scores_here, tl;dr",
+    "wannabe gonnabe xcannot can-not",
+    "",
+]
+
+
+def test_cleaning_parity():
+
+    for tweet in SAMPLE_TWEETS:
+        text = remove_handles(tweet)
+        assert fast_preprocess_text(text) == preprocess_text(text), tweet
+
+    if DATA_PATH.exists():
+        # Sentiment140 is sorted by label, so sample both halves
+        df = pd.read_csv(DATA_PATH, encoding="ISO-8859-1", names=names)
+        sample = pd.concat([df.head(10_000), df.tail(10_000)])
+        assert len(sample) == 20_000
+
+        for tweet in sample["tweet_text"]:
+            text = remove_handles(tweet)
+            assert fast_preprocess_text(text) == preprocess_text(text), tweet
+
+
+if __name__ == "__main__":
+
+    test_cleaning_parity()
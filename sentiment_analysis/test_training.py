@@ -0,0 +1,132 @@
+import json
+import os
+import random
+
+import pandas as pd
+
+from data_cleaning.corpus import CorpusWriter
+from training.sweep import sweep
+from training.train import TrainConfig, main
+
+POSITIVE = ["love", "great", "happy", "awesome", "thanks", "best"]
+NEGATIVE = ["hate", "awful", "tired", "worst", "sucks", "miss"]
+NEUTRAL = ["today", "work", "home", "night", "week", "going"]
+
+
+def synthetic_tweets(n=600, seed=67):
+    # Sentiment140 labels are 0/4, which is what broke evaluation before
+
+    rng = random.Random(seed)
+    rows = []
+
+    for i in range(n):
+        label = 4 if i % 2 else 0
+        words = POSITIVE if label else NEGATIVE
+        tokens = rng.choices(words, k=3) + rng.choices(NEUTRAL, k=3)
+        rng.shuffle(tokens)
+        rows.append((label, tokens))
+
+    return rows
+
+
+def write_cleaned_csv(path, rows):
+
+    pd.DataFrame(
+        {
+            "sentiment": [label for label, _ in rows],
+            "tweet_text": [" ".join(tokens) for _, tokens in rows],
+            "cleaned_tweet": [str(tokens) for _, tokens in rows],
+        }
+    ).to_csv(path, index=False)
+
+
+def small_config(tmp_path, **kwargs):
+
+    return TrainConfig(
+        LOGGING=False,
+        MODEL_REPORTS_DIR=str(tmp_path / "model_reports"),
+        CLEANED_OUT=tmp_path / "cleaned_data.csv",
+        CORPUS_DIR=tmp_path / "corpus",
+        MIN_DF=1,
+        MAX_FEATURES=1000,
+        MAX_ITER=200,
+        CHUNK_SIZE=128,
+        HASH_FEATURES=2**12,
+        EPOCHS=2,
+        **kwargs,
+    )
+
+
+def check_reports(config):
+
+    for name in ("model.joblib", "vectorizer.joblib", "config.yaml", "metrics.json"):
+        assert os.path.exists(os.path.join(config.MODEL_REPORTS_DIR, name)), name
+
+    with open(os.path.join(config.MODEL_REPORTS_DIR, "metrics.json")) as f:
+        metrics = json.load(f)
+
+    assert metrics["stages"]["evaluate"]["test"]["f1_score"] > 0.9
+
+    return metrics
+
+
+def test_train_end_to_end(tmp_path):
+
+    rows = synthetic_tweets()
+    write_cleaned_csv(tmp_path / "cleaned_data.csv", rows)
+
+    config = small_config(tmp_path, USE_CORPUS=False)
+    main(config)
+    metrics = check_reports(config)
+    assert metrics["stages"]["load"]["source"] == "csv"
+
+    with CorpusWriter(tmp_path / "corpus") as corpus:
+        corpus.add([tokens for _, tokens in rows], [label for label, _ in rows])
+
+    config = small_config(tmp_path)
+    main(config)
+    metrics = check_reports(config)
+    assert metrics["stages"]["load"]["source"] == "corpus"
+
+
+def test_train_out_of_core_end_to_end(tmp_path):
+
+    write_cleaned_csv(tmp_path / "cleaned_data.csv", synthetic_tweets())
+
+    config = small_config(tmp_path, OUT_OF_CORE=True)
+    main(config)
+    check_reports(config)
+
+
+def test_sweep_end_to_end(tmp_path):
+
+    write_cleaned_csv(tmp_path / "cleaned_data.csv", synthetic_tweets())
+
+    config = small_config(
+        tmp_path, USE_CORPUS=False, SWEEP_CACHE_DIR=tmp_path / "sweep_cache"
+    )
+    grid = dict(Cs=(0.5, 2.0), l1_ratios=(0.0, 0.5), min_dfs=(1, 2), workers=1)
+
+    results = sweep(config, **grid)
+
+    assert len(results) == 8
+    assert os.path.exists(os.path.join(config.MODEL_REPORTS_DIR, "sweep_results.csv"))
+    assert len(os.listdir(tmp_path / "sweep_cache")) == 2
+
+    # second run reads the cached matrices and reproduces every row
+    again = sweep(config, **grid)
+    columns = ["MIN_DF", "L1_RATIO", "C", "test_f1_score", "nonzero_coef"]
+    assert again[columns].equals(results[columns])
+
+
+if __name__ == "__main__":
+
+    import pathlib
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_train_end_to_end(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_train_out_of_core_end_to_end(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_sweep_end_to_end(pathlib.Path(tmp))
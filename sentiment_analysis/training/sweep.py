@@ -0,0 +1,270 @@
+import os, sys, json, time, shutil, hashlib, itertools
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, dump
+from scipy.sparse import load_npz, save_npz
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from train import (
+    Corpus,
+    TrainConfig,
+    evaluate_predictions,
+    load_features,
+    lprint,
+    positive_label,
+    print_between_dividers,
+    set_seed,
+)
+
+# settings that change the vectorized matrices, everything else only the model
+VECTORIZER_KEYS = ("MAX_FEATURES", "MIN_DF", "NGRAM_RANGE", "TEST_SIZE", "USE_CORPUS")
+
+
+def data_fingerprint(config: TrainConfig) -> dict:
+    # size + mtime of the training input, so re-cleaning invalidates the cache
+
+    if config.USE_CORPUS and Corpus.exists(config.CORPUS_DIR):
+        path = os.path.join(config.CORPUS_DIR, "tokens.npy")
+    else:
+        path = config.CLEANED_OUT
+
+    stat = os.stat(path)
+    return {"path": str(path), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def vectorizer_key(config: TrainConfig) -> str:
+
+    settings = {key: getattr(config, key) for key in VECTORIZER_KEYS}
+    settings["data"] = data_fingerprint(config)
+
+    blob = json.dumps(settings, sort_keys=True, default=list)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_features(config: TrainConfig, if_print: bool = True) -> str:
+    """Directory holding the fitted vectorizer and train/test matrices.
+
+    Built once per ``vectorizer_key``: ``vectorizer.joblib``, ``X_train.npz``,
+    ``X_test.npz``, ``y_train.npy``, ``y_test.npy`` and ``settings.json``.
+    """
+
+    key = vectorizer_key(config)
+    cache_dir = os.path.join(config.SWEEP_CACHE_DIR, key)
+
+    if os.path.exists(os.path.join(cache_dir, "settings.json")):
+        lprint(if_print, f"Using cached features {key}\n")
+        return cache_dir
+
+    vec, X_train_vec, X_test_vec, y_train, y_test = load_features(
+        config, if_print=False
+    )
+
+    # written to a temp dir and renamed, so a killed run never leaves half a cache
+    tmp_dir = f"{cache_dir}.tmp{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    dump(vec, os.path.join(tmp_dir, "vectorizer.joblib"))
+    save_npz(os.path.join(tmp_dir, "X_train.npz"), X_train_vec, compressed=False)
+    save_npz(os.path.join(tmp_dir, "X_test.npz"), X_test_vec, compressed=False)
+    np.save(os.path.join(tmp_dir, "y_train.npy"), np.asarray(y_train))
+    np.save(os.path.join(tmp_dir, "y_test.npy"), np.asarray(y_test))
+
+    with open(os.path.join(tmp_dir, "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                **{key: getattr(config, key) for key in VECTORIZER_KEYS},
+                "features": X_train_vec.shape[1],
+                "data": data_fingerprint(config),
+            },
+            f,
+            indent=2,
+            default=list,
+        )
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+    lprint(if_print, f"Cached features {key} ({X_train_vec.shape[1]} columns)\n")
+
+    return cache_dir
+
+
+def fit_path(cache_dir: str, config: TrainConfig, l1_ratio: float, Cs) -> list:
+    """Fit one L1_RATIO over increasing C, each fit warm-started from the last.
+
+    Small C gives the most regularized (sparsest) solution, which is a good
+    starting point for the next, slightly looser one, so later fits on the
+    path converge in far fewer saga iterations than from zeros.
+    """
+
+    X_train = load_npz(os.path.join(cache_dir, "X_train.npz"))
+    X_test = load_npz(os.path.join(cache_dir, "X_test.npz"))
+    y_train = np.load(os.path.join(cache_dir, "y_train.npy"))
+    y_test = np.load(os.path.join(cache_dir, "y_test.npy"))
+
+    clf = LogisticRegression(
+        penalty=config.PENALTY,
+        l1_ratio=l1_ratio,
+        solver=config.SOLVER,
+        max_iter=config.MAX_ITER,
+        class_weight=config.CLASS_WEIGHT,
+        warm_start=True,
+        # saga shuffles samples, seed it so every row can be reproduced
+        random_state=67,
+    )
+    pos_label = positive_label(config)
+
+    rows = []
+
+    for C in sorted(Cs):
+        clf.set_params(C=C)
+
+        start = time.perf_counter()
+        clf.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        train_report = evaluate_predictions(
+            y_train,
+            clf.predict(X_train),
+            print_report=False,
+            return_report=True,
+            pos_label=pos_label,
+        )
+        test_report = evaluate_predictions(
+            y_test,
+            clf.predict(X_test),
+            print_report=False,
+            return_report=True,
+            pos_label=pos_label,
+        )
+
+        rows.append(
+            {
+                "MAX_FEATURES": config.MAX_FEATURES,
+                "MIN_DF": config.MIN_DF,
+                "NGRAM_RANGE": "-".join(map(str, config.NGRAM_RANGE)),
+                "L1_RATIO": l1_ratio,
+                "C": C,
+                "features": X_train.shape[1],
+                "n_iter": int(np.max(clf.n_iter_)),
+                "fit_seconds": round(fit_seconds, 3),
+                "nonzero_coef": int(np.count_nonzero(clf.coef_)),
+                **{f"train_{k}": v for k, v in train_report.items()},
+                **{f"test_{k}": v for k, v in test_report.items()},
+            }
+        )
+
+    return rows
+
+
+def sweep(
+    config: TrainConfig = None,
+    Cs=(0.25, 0.5, 1.0, 2.0),
+    l1_ratios=(0.0, 0.25, 0.5),
+    max_features=None,
+    min_dfs=None,
+    ngram_ranges=None,
+    workers: int = -1,
+) -> pd.DataFrame:
+    """Grid search over vectorizer and LR settings.
+
+    Every distinct vectorizer setting is fitted once and cached on disk
+    (``cached_features``). Each (vectorizer, L1_RATIO) pair is then an
+    independent warm-started path over ``Cs`` (``fit_path``), and the paths
+    run in parallel across ``workers`` processes. Each worker loads its own
+    copy of the matrices, so memory grows with ``workers``.
+
+    Writes ``sweep_results.csv`` to ``MODEL_REPORTS_DIR``, best test F1 first.
+    """
+
+    config = config or TrainConfig()
+    set_seed()
+
+    if_print = config.LOGGING
+
+    grid = list(
+        itertools.product(
+            max_features or [config.MAX_FEATURES],
+            min_dfs or [config.MIN_DF],
+            ngram_ranges or [config.NGRAM_RANGE],
+        )
+    )
+
+    print_between_dividers(
+        if_print,
+        f"[1/2] Vectorizing {len(grid)} feature setting(s) (cached by settings)...",
+    )
+
+    jobs = []
+
+    for n_features, min_df, ngram_range in grid:
+        vec_config = replace(
+            config,
+            MAX_FEATURES=n_features,
+            MIN_DF=min_df,
+            NGRAM_RANGE=tuple(ngram_range),
+        )
+        cache_dir = cached_features(vec_config, if_print)
+
+        jobs.extend((cache_dir, vec_config, l1_ratio) for l1_ratio in l1_ratios)
+
+    print_between_dividers(
+        if_print,
+        f"[2/2] Fitting {len(jobs)} warm-started path(s) of {len(Cs)} C values...",
+    )
+
+    paths = Parallel(n_jobs=workers, verbose=10 if if_print else 0)(
+        delayed(fit_path)(cache_dir, vec_config, l1_ratio, Cs)
+        for cache_dir, vec_config, l1_ratio in jobs
+    )
+
+    results = pd.DataFrame([row for rows in paths for row in rows])
+    results = results.sort_values("test_f1_score", ascending=False, ignore_index=True)
+
+    os.makedirs(config.MODEL_REPORTS_DIR, exist_ok=True)
+    out_path = os.path.join(config.MODEL_REPORTS_DIR, "sweep_results.csv")
+    results.to_csv(out_path, index=False)
+
+    lprint(if_print, results.to_string(index=False), "\n")
+    print(f"\n[ok] Saved sweep results to: {out_path}")
+
+    return results
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    def ngram_range(value):
+        low, high = value.split("-")
+        return int(low), int(high)
+
+    arg_parser = argparse.ArgumentParser(
+        description="Sweep TF-IDF and LR settings with cached features"
+    )
+    arg_parser.add_argument("--C", type=float, nargs="+", default=[0.25, 0.5, 1, 2])
+    arg_parser.add_argument(
+        "--l1-ratio", type=float, nargs="+", default=[0.0, 0.25, 0.5]
+    )
+    arg_parser.add_argument("--max-features", type=int, nargs="+")
+    arg_parser.add_argument("--min-df", type=int, nargs="+")
+    arg_parser.add_argument(
+        "--ngram-range", type=ngram_range, nargs="+", help="e.g. 1-1 1-2"
+    )
+    arg_parser.add_argument("--workers", type=int, default=-1)
+    args = arg_parser.parse_args()
+
+    sweep(
+        TrainConfig(),
+        Cs=args.C,
+        l1_ratios=args.l1_ratio,
+        max_features=args.max_features,
+        min_dfs=args.min_df,
+        ngram_ranges=args.ngram_range,
+        workers=args.workers,
+    )
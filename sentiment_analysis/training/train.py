@@ -1,5 +1,7 @@
-import os, re, json, random
+import os, re, sys, json, time, random, pickle, tempfile
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
 from typing import List, Dict, Any
 from pathlib import Path
 
@@ -10,8 +12,14 @@ import pandas as pd
 # Machine learning libraries
 from joblib import dump, load
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+    strip_accents_unicode,
+)
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
 from sklearn.metrics import (
     accuracy_score,
     precision_recall_fscore_support,
@@ -20,6 +28,16 @@ from sklearn.metrics import (
 )
 
 from sklearn.utils import Bunch
+from scipy.sparse import csr_matrix, hstack
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "data_cleaning"))
+
+from corpus import Corpus
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 
 def lprint(if_print: bool, *args):
@@ -54,6 +72,15 @@ def set_seed(seed: int = 67):
     np.random.seed(seed)
 
 
+# Sentiment140 labels
+LABEL_MAP = {"negative": 0, "positive": 4}
+
+
+def positive_label(config) -> int:
+
+    return (config.LABEL_MAP or LABEL_MAP)["positive"]
+
+
 @dataclass
 class TrainConfig:
     "Just all da stuff i need for training"
@@ -63,6 +90,11 @@ class TrainConfig:
     ROOT_DIR = Path(__file__).parent.parent
     DATA_PATH: str = ROOT_DIR / "data/data.csv"
     CLEANED_OUT: str = ROOT_DIR / "data/cleaned_data.csv"
+    CORPUS_DIR: str = ROOT_DIR / "data/corpus"
+    USE_CORPUS: bool = True
+    # how the model expects its input: "repr" of the token list as in
+    # cleaned_data.csv, or "joined" tokens when trained from the corpus
+    TEXT_FORMAT: str = "repr"
     MAX_FEATURES: int = 200_000
     MIN_DF: int = 5
     NGRAM_RANGE: tuple[int, int] = (1, 2)
@@ -74,6 +106,85 @@ class TrainConfig:
     MAX_ITER: int = 2000
     CLASS_WEIGHT: str = "balanced"
     LABEL_MAP: dict = None
+    # out-of-core mode: hashed features + SGD over shuffled on-disk shards
+    OUT_OF_CORE: bool = False
+    CHUNK_SIZE: int = 100_000
+    HASH_FEATURES: int = 2**21
+    EPOCHS: int = 5
+    SGD_ALPHA: float = 1e-6
+    # sweep.py: fitted vectorizers and .npz matrices, one dir per settings hash
+    SWEEP_CACHE_DIR: str = ROOT_DIR / "data/sweep_cache"
+
+
+# stage-level instrumentation, saved as metrics.json next to config.yaml
+def peak_rss_mb():
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def matrix_info(x) -> Dict[str, Any]:
+
+    return {"shape": list(x.shape), "nnz": int(x.nnz)}
+
+
+class RunMetrics:
+    """Wall time, CPU time and peak RSS per training stage.
+
+    ``stage`` yields a dict for extra facts about the stage (matrix shapes,
+    solver iterations, scores). Peak RSS is the process high-water mark when
+    the stage ends, so a jump between stages shows where memory went.
+    """
+
+    def __init__(self):
+
+        self.started = datetime.now(timezone.utc)
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+
+        info = {}
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        yield info
+
+        self.stages[name] = {
+            "wall_seconds": round(time.perf_counter() - wall, 3),
+            "cpu_seconds": round(time.process_time() - cpu, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            **info,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self.start_wall, 3),
+            "cpu_seconds": round(time.process_time() - self.start_cpu, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+        }
+
+    def summary(self) -> str:
+
+        return "\n".join(
+            f"{name:<10} {stage['wall_seconds']:>9.2f}s wall "
+            f"{stage['cpu_seconds']:>9.2f}s cpu "
+            f"{stage['peak_rss_mb'] or 0:>9.1f} MB peak"
+            for name, stage in self.stages.items()
+        )
+
+
+def solver_iterations(model) -> int:
+
+    return int(np.max(model.n_iter_))
 
 
 # making vectorizer(basically converting text to numbers)
@@ -115,16 +226,32 @@ def evaluate_model(
     split_name: str = "Test",
     print_report: bool = True,
     return_report: bool = False,
+    pos_label=LABEL_MAP["positive"],
 ) -> Dict[str, Any]:
 
     y_pred = model.predict(x_test)
+
+    return evaluate_predictions(
+        y_test, y_pred, split_name, print_report, return_report, pos_label
+    )
+
+
+def evaluate_predictions(
+    y_test,
+    y_pred,
+    split_name: str = "Test",
+    print_report: bool = True,
+    return_report: bool = False,
+    pos_label=LABEL_MAP["positive"],
+) -> Dict[str, Any]:
+
     accuracy = accuracy_score(y_test, y_pred)
 
     unique_labels = np.unique(y_test)
     if len(unique_labels) == 2:
         precision, recall, f1, _ = precision_recall_fscore_support(
-            y_test, y_pred, average="binary", zero_division=0
-    )
+            y_test, y_pred, average="binary", pos_label=pos_label, zero_division=0
+        )
     else:
 
         precision, recall, f1, _ = precision_recall_fscore_support(
@@ -155,103 +282,548 @@ def evaluate_model(
         }
 
 
-def save_model_report(
-    vec: TfidfVectorizer, model: LogisticRegression, config: TrainConfig
+# pre-tokenized corpus (written by data_cleaning/clean_data.py)
+def corpus_terms(corpus: Corpus):
+    "Accent-stripped vocabulary and the id map onto it, as ``strip_accents``"
+
+    terms, remap = np.unique(
+        [strip_accents_unicode(term) for term in corpus.vocab], return_inverse=True
+    )
+
+    return terms.tolist(), remap.ravel().astype(np.int64)
+
+
+def corpus_ngram_counts(tokens, offsets, vocab_size: int, n: int):
+    "Per-document counts of every n-gram, keyed by packed token ids"
+
+    vocab_size = max(vocab_size, 1)
+
+    if vocab_size**n >= 2**63:
+        raise ValueError(f"{n}-grams over {vocab_size} terms do not fit in int64")
+
+    n_docs = len(offsets) - 1
+    doc_of = np.repeat(np.arange(n_docs, dtype=np.int64), np.diff(offsets))
+
+    # n-grams starting at each position that stay inside one document
+    starts = np.flatnonzero(doc_of[: len(tokens) - n + 1] == doc_of[n - 1 :])
+
+    keys = tokens[starts].copy()
+    for k in range(1, n):
+        keys = keys * vocab_size + tokens[starts + k]
+
+    grams, cols = np.unique(keys, return_inverse=True)
+    counts = csr_matrix(
+        (np.ones(len(keys), dtype=np.float64), (doc_of[starts], cols.ravel())),
+        shape=(n_docs, len(grams)),
+    )
+    counts.sum_duplicates()
+
+    return counts, grams
+
+
+def gram_terms(terms: List[str], grams, n: int) -> List[str]:
+
+    vocab_size = max(len(terms), 1)
+    ids = np.empty((len(grams), n), dtype=np.int64)
+
+    for k in range(n - 1, -1, -1):
+        grams, ids[:, k] = np.divmod(grams, vocab_size)
+
+    return [" ".join(terms[i] for i in row) for row in ids]
+
+
+def build_corpus_features(corpus: Corpus, train_idx, test_idx, config: TrainConfig):
+    """TF-IDF features straight from token ids, no text parsing.
+
+    Follows ``build_vectorizer``: accents stripped, n-grams in
+    ``NGRAM_RANGE``, ``MIN_DF`` and then the ``MAX_FEATURES`` most frequent
+    terms, all counted on the training rows, with sublinear tf. The returned
+    vectorizer carries that vocabulary and idf, so it transforms
+    space-joined tokens the same way.
+    """
+
+    terms, remap = corpus_terms(corpus)
+    tokens = remap[np.asarray(corpus.tokens)]
+    offsets = np.asarray(corpus.offsets)
+
+    blocks, names = [], []
+
+    for n in range(config.NGRAM_RANGE[0], config.NGRAM_RANGE[1] + 1):
+        counts, grams = corpus_ngram_counts(tokens, offsets, len(terms), n)
+
+        train_counts = counts[train_idx]
+        df = np.bincount(train_counts.indices, minlength=counts.shape[1])
+        keep = np.flatnonzero(df >= config.MIN_DF)
+
+        blocks.append(
+            (counts[:, keep], np.asarray(train_counts.sum(axis=0)).ravel()[keep])
+        )
+        names.extend(gram_terms(terms, grams[keep], n))
+
+    counts = hstack([block for block, _ in blocks], format="csr")
+    term_freq = np.concatenate([tf for _, tf in blocks])
+
+    if config.MAX_FEATURES and len(names) > config.MAX_FEATURES:
+        top = np.sort(np.argsort(-term_freq, kind="stable")[: config.MAX_FEATURES])
+        counts = counts[:, top]
+        names = [names[i] for i in top]
+
+    vec = TfidfVectorizer(
+        tokenizer=str.split,
+        token_pattern=None,
+        lowercase=False,
+        ngram_range=config.NGRAM_RANGE,
+        strip_accents="unicode",
+        sublinear_tf=True,
+        vocabulary={term: i for i, term in enumerate(names)},
+    )
+
+    tfidf = TfidfTransformer(sublinear_tf=True).fit(counts[train_idx])
+    vec.idf_ = tfidf.idf_
+
+    return vec, tfidf.transform(counts[train_idx]), tfidf.transform(counts[test_idx])
+
+
+# out-of-core training (memory bounded by CHUNK_SIZE rows)
+def build_hashing_vectorizer(config: TrainConfig) -> Pipeline:
+
+    # stateless hashing + a TfidfTransformer whose idf_ is filled in from
+    # streamed document frequencies, so the saved object transforms raw text
+    # exactly like the TfidfVectorizer does
+    return Pipeline(
+        [
+            (
+                "hash",
+                HashingVectorizer(
+                    tokenizer=str.split,
+                    token_pattern=None,
+                    lowercase=False,
+                    ngram_range=config.NGRAM_RANGE,
+                    n_features=config.HASH_FEATURES,
+                    strip_accents="unicode",
+                    alternate_sign=False,
+                    norm=None,
+                ),
+            ),
+            ("tfidf", TfidfTransformer(sublinear_tf=True)),
+        ]
+    )
+
+
+class IncrementalIdf:
+    "Document frequencies of hashed features, accumulated chunk by chunk"
+
+    def __init__(self, n_features: int, min_df: int = 1):
+
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.min_df = min_df
+
+    def partial_fit(self, counts):
+
+        counts = counts.tocsr()
+        counts.sum_duplicates()
+        self.df += np.bincount(counts.indices, minlength=len(self.df))
+        self.n_docs += counts.shape[0]
+
+    def idf(self) -> np.ndarray:
+
+        # same smoothing as TfidfTransformer, rare features are zeroed out
+        idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1
+        idf[self.df < self.min_df] = 0.0
+        return idf
+
+
+def iter_cleaned_chunks(config: TrainConfig):
+
+    for chunk in pd.read_csv(
+        config.CLEANED_OUT,
+        usecols=["sentiment", "cleaned_tweet"],
+        chunksize=config.CHUNK_SIZE,
+    ):
+        chunk = chunk.dropna()
+        yield (
+            chunk["cleaned_tweet"].astype(str).to_numpy(),
+            chunk["sentiment"].to_numpy(),
+        )
+
+
+def count_rows(path) -> int:
+
+    # newline count, close enough to size the shards
+    rows = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 24), b""):
+            rows += block.count(b"\n")
+    return max(rows - 1, 1)
+
+
+def read_shard(path: str):
+
+    texts, labels = [], []
+
+    with open(path, "rb") as f:
+        while True:
+            try:
+                chunk_texts, chunk_labels = pickle.load(f)
+            except EOFError:
+                break
+            texts.append(chunk_texts)
+            labels.append(chunk_labels)
+
+    if not texts:
+        return np.array([], dtype=object), np.array([])
+
+    return np.concatenate(texts), np.concatenate(labels)
+
+
+def spill_shards(
+    config: TrainConfig, vec: Pipeline, tmp_dir: str, if_print: bool = True
 ):
+    """One streaming pass: split train/test, shuffle rows into shards, count df.
 
-    os.makedirs(config.MODEL_REPORTS_DIR, exist_ok=True)
+    Sentiment140 is sorted by label, so SGD cannot read it in file order.
+    Rows are scattered at random into shard files of about CHUNK_SIZE rows
+    each, and every epoch then visits the shards in a random order.
+    """
 
-    dump(vec, os.path.join(config.MODEL_REPORTS_DIR, "vectorizer.joblib"))
-    dump(model, os.path.join(config.MODEL_REPORTS_DIR, "model.joblib"))
+    rng = np.random.default_rng(67)
+    hasher = vec.named_steps["hash"]
+    idf = IncrementalIdf(config.HASH_FEATURES, config.MIN_DF)
+    class_counts = {}
 
-    label_map = {"negative": 0, "positive": 4}
+    n_train = count_rows(config.CLEANED_OUT) * (1 - config.TEST_SIZE)
+    n_shards = max(1, int(np.ceil(n_train / config.CHUNK_SIZE)))
+    shard_paths = [os.path.join(tmp_dir, f"shard_{i}.pkl") for i in range(n_shards)]
+    test_path = os.path.join(tmp_dir, "test.pkl")
 
-    with open(
-        os.path.join(config.MODEL_REPORTS_DIR, "label_map.json"), "w", encoding="utf-8"
-    ) as f:
+    for i, (texts, labels) in enumerate(iter_cleaned_chunks(config)):
+
+        is_test = rng.random(len(texts)) < config.TEST_SIZE
+        train_texts, train_labels = texts[~is_test], labels[~is_test]
+
+        shard_of = rng.integers(0, n_shards, len(train_texts))
+        for shard in np.unique(shard_of):
+            mask = shard_of == shard
+            with open(shard_paths[shard], "ab") as f:
+                pickle.dump((train_texts[mask], train_labels[mask]), f)
+
+        with open(test_path, "ab") as f:
+            pickle.dump((texts[is_test], labels[is_test]), f)
+
+        idf.partial_fit(hasher.transform(train_texts))
+        for label, count in zip(*np.unique(train_labels, return_counts=True)):
+            class_counts[label] = class_counts.get(label, 0) + int(count)
+
+        lprint(if_print, f"Spilled chunk {i + 1} ({idf.n_docs} training rows)")
+
+    return shard_paths, test_path, idf, class_counts
+
+
+def train_model_out_of_core(config: TrainConfig, if_print: bool = True):
+
+    vec = build_hashing_vectorizer(config)
+    rng = np.random.default_rng(67)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        shard_paths, test_path, idf, class_counts = spill_shards(
+            config, vec, tmp_dir, if_print
+        )
+
+        vec.named_steps["tfidf"].idf_ = idf.idf()
+
+        classes = np.array(sorted(class_counts))
+        total = sum(class_counts.values())
+        # "balanced" weights, which partial_fit cannot compute on its own
+        class_weight = {
+            label: total / (len(classes) * count)
+            for label, count in class_counts.items()
+        }
+
+        model = SGDClassifier(
+            loss="log_loss",
+            penalty=config.PENALTY,
+            l1_ratio=config.L1_RATIO,
+            alpha=config.SGD_ALPHA,
+            class_weight=class_weight,
+            random_state=67,
+        )
+
+        for epoch in range(config.EPOCHS):
+            for shard in rng.permutation(len(shard_paths)):
+                texts, labels = read_shard(shard_paths[shard])
+                if not len(texts):
+                    continue
+
+                order = rng.permutation(len(texts))
+                model.partial_fit(
+                    vec.transform(texts[order]), labels[order], classes=classes
+                )
+
+            lprint(if_print, f"Epoch {epoch + 1}/{config.EPOCHS} complete")
+
+        y_test, y_pred = [], []
+        with open(test_path, "rb") as f:
+            while True:
+                try:
+                    texts, labels = pickle.load(f)
+                except EOFError:
+                    break
+                if len(texts):
+                    y_test.append(labels)
+                    y_pred.append(model.predict(vec.transform(texts)))
+
+    return vec, model, np.concatenate(y_test), np.concatenate(y_pred)
+
+
+def save_model_report(vec, model, config: TrainConfig, metrics: RunMetrics = None):
+
+    metrics = metrics or RunMetrics()
+
+    with metrics.stage("save"):
+        os.makedirs(config.MODEL_REPORTS_DIR, exist_ok=True)
+
+        dump(vec, os.path.join(config.MODEL_REPORTS_DIR, "vectorizer.joblib"))
+        dump(model, os.path.join(config.MODEL_REPORTS_DIR, "model.joblib"))
 
-        json.dump(label_map, f, indent=2)
+        label_map = config.LABEL_MAP or LABEL_MAP
 
-    import yaml
+        with open(
+            os.path.join(config.MODEL_REPORTS_DIR, "label_map.json"),
+            "w",
+            encoding="utf-8",
+        ) as f:
 
+            json.dump(label_map, f, indent=2)
+
+        import yaml
+
+        with open(
+            os.path.join(config.MODEL_REPORTS_DIR, "config.yaml"), "w", encoding="utf-8"
+        ) as f:
+
+            yaml.safe_dump(
+                {
+                    key: str(value) if isinstance(value, Path) else value
+                    for key, value in asdict(config).items()
+                },
+                f,
+                sort_keys=False,
+            )
+
+    # written last so it covers the save stage too
     with open(
-        os.path.join(config.MODEL_REPORTS_DIR, "config.yaml"), "w", encoding="utf-8"
+        os.path.join(config.MODEL_REPORTS_DIR, "metrics.json"), "w", encoding="utf-8"
     ) as f:
 
-        yaml.safe_dump(asdict(config), f, sort_keys=False)
+        json.dump(metrics.to_dict(), f, indent=2, default=float)
 
     print(f"\n[ok] Saved artifacts to: {config.MODEL_REPORTS_DIR}")
 
 
-def main():
-
-    config = TrainConfig()
-    set_seed()
-
-    total_parts = 5
+def main_out_of_core(config: TrainConfig):
 
+    total_parts = 3
     if_print = config.LOGGING
 
     print_between_dividers(
-        if_print, "Sentiment Analysis Model Training On Sentiment 140"
+        if_print, "Out-of-core Training On Sentiment 140 (hashing + SGD)"
     )
 
-    line(if_print)
-    line(if_print)
+    print_between_dividers(
+        if_print,
+        f"[1/{total_parts}] Streaming, shuffling and training "
+        f"({config.EPOCHS} epochs, {config.CHUNK_SIZE} rows per chunk)...",
+    )
+
+    metrics = RunMetrics()
+
+    # loading, vectorizing and fitting are interleaved chunk by chunk here
+    with metrics.stage("fit") as info:
+        vec, model, y_test, y_pred = train_model_out_of_core(config, if_print)
+        info.update(
+            solver="sgd",
+            n_iter=solver_iterations(model),
+            test_rows=len(y_test),
+            hash_features=config.HASH_FEATURES,
+        )
+
+    print_between_dividers(if_print, f"[2/{total_parts}] Evaluating model...")
+
+    with metrics.stage("evaluate") as info:
+        info["test"] = evaluate_predictions(
+            y_test,
+            y_pred,
+            split_name="Test",
+            return_report=True,
+            pos_label=positive_label(config),
+        )
+
+    print_between_dividers(if_print, f"[3/{total_parts}] Saving artifacts...")
+
+    save_model_report(vec, model, config, metrics)
+
+    lprint(if_print, metrics.summary(), "\n")
+
+    lprint(if_print, "All done!")
+
+
+def load_features(
+    config: TrainConfig,
+    if_print: bool = True,
+    total_parts: int = 5,
+    metrics: RunMetrics = None,
+):
+    "Load, split and vectorize (steps 1-3 of ``main``)"
+
+    metrics = metrics or RunMetrics()
 
     print_between_dividers(if_print, f"[1/{total_parts}] Loading and preparing data...")
 
-    df = pd.read_csv(config.CLEANED_OUT)
+    use_corpus = config.USE_CORPUS and Corpus.exists(config.CORPUS_DIR)
+
+    with metrics.stage("load") as info:
+        if use_corpus:
+            # token ids are memory-mapped, nothing is parsed or tokenized again
+            corpus = Corpus.load(config.CORPUS_DIR)
+            labels = np.asarray(corpus.labels)
+            config.TEXT_FORMAT = "joined"
+            info.update(source="corpus", rows=len(corpus), tokens=len(corpus.tokens))
+        else:
+            df = pd.read_csv(config.CLEANED_OUT)
+            info.update(source="csv", rows=len(df))
 
-    lprint(if_print, f"Success!   \n Total samples: {len(df)} \n \n")
+    lprint(
+        if_print,
+        f"Success!   \n Total samples: {info['rows']} ({info['source']}) \n \n",
+    )
 
     print_between_dividers(
         if_print, f"[2/{total_parts}] Splitting into train and test sets..."
     )
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        df["cleaned_tweet"].values,
-        df["sentiment"].values,
-        test_size=config.TEST_SIZE,
-        random_state=67,
-        stratify=df["sentiment"].values,
-    )
+    with metrics.stage("split") as info:
+        if use_corpus:
+            train_idx, test_idx, y_train, y_test = train_test_split(
+                np.arange(len(corpus)),
+                labels,
+                test_size=config.TEST_SIZE,
+                random_state=67,
+                stratify=labels,
+            )
+        else:
+            X_train, X_test, y_train, y_test = train_test_split(
+                df["cleaned_tweet"].to_numpy(),
+                df["sentiment"].to_numpy(),
+                test_size=config.TEST_SIZE,
+                random_state=67,
+                stratify=df["sentiment"].to_numpy(),
+            )
+
+        info.update(train_rows=len(y_train), test_rows=len(y_test))
 
     lprint(
         if_print,
-        f"Success!   \n Train samples: {len(X_train)} \n Test samples: {len(X_test)} \n \n",
+        f"Success!   \n Train samples: {len(y_train)} \n Test samples: {len(y_test)} \n \n",
     )
 
     print_between_dividers(if_print, f"[3/{total_parts}] Building vectorizer...")
 
-    vec = build_vectorizer(config)
+    with metrics.stage("vectorize") as info:
+        if use_corpus:
+            vec, X_train_vec, X_test_vec = build_corpus_features(
+                corpus, train_idx, test_idx, config
+            )
+        else:
+            vec = build_vectorizer(config)
+
+            lprint(if_print, "Success! \n")
+
+            X_train_vec = vec.fit_transform(X_train)
+            X_test_vec = vec.transform(X_test)
+
+        info.update(train=matrix_info(X_train_vec), test=matrix_info(X_test_vec))
 
-    lprint(if_print, "Success! \n")
+    return vec, X_train_vec, X_test_vec, y_train, y_test
 
-    X_train_vec = vec.fit_transform(X_train)
-    X_test_vec = vec.transform(X_test)
+
+def main(config: TrainConfig = None):
+
+    config = config or TrainConfig()
+    set_seed()
+
+    if config.OUT_OF_CORE:
+        return main_out_of_core(config)
+
+    total_parts = 5
+
+    if_print = config.LOGGING
+
+    print_between_dividers(
+        if_print, "Sentiment Analysis Model Training On Sentiment 140"
+    )
+
+    line(if_print)
+    line(if_print)
+
+    metrics = RunMetrics()
+
+    vec, X_train_vec, X_test_vec, y_train, y_test = load_features(
+        config, if_print, total_parts, metrics
+    )
 
     lprint(if_print, "Vectorization complete! \n")
 
     print_between_dividers(if_print, f"[4/{total_parts}] Training model...")
-    model = train_model(X_train_vec, y_train, config)
+
+    with metrics.stage("fit") as info:
+        model = train_model(X_train_vec, y_train, config)
+        info.update(solver=config.SOLVER, n_iter=solver_iterations(model))
 
     lprint(if_print, "Model training complete! \n")
 
     print_between_dividers(if_print, f"[5/{total_parts}] Evaluating model...")
 
-    evaluate_model(model, X_train_vec, y_train, split_name="Train")
-    evaluate_model(model, X_test_vec, y_test, split_name="Test")
+    with metrics.stage("evaluate") as info:
+        info["train"] = evaluate_model(
+            model,
+            X_train_vec,
+            y_train,
+            split_name="Train",
+            return_report=True,
+            pos_label=positive_label(config),
+        )
+        info["test"] = evaluate_model(
+            model,
+            X_test_vec,
+            y_test,
+            split_name="Test",
+            return_report=True,
+            pos_label=positive_label(config),
+        )
 
     lprint(if_print, "Evaluation complete! \n")
 
     print_between_dividers(if_print, f"[6/{total_parts}] Saving artifacts...")
 
-    save_model_report(vec, model, config)
+    save_model_report(vec, model, config, metrics)
+
+    lprint(if_print, metrics.summary(), "\n")
 
     lprint(if_print, "All done!")
 
 
 if __name__ == "__main__":
 
-    main()
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Train the TF-IDF LR model")
+    arg_parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="stream the CSV in chunks and train an SGD model with partial_fit",
+    )
+    args = arg_parser.parse_args()
+
+    main(TrainConfig(OUT_OF_CORE=args.out_of_core))